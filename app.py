@@ -1,31 +1,51 @@
 """
 AI-Powered Student Result Management System — Adeleke University
 Single-file application: models, grading utilities, ML analyzer, and all routes.
-Run:  python app.py
+Run:  python app.py [--measure-startup]
 """
 
+import time
+_STARTED = time.perf_counter()   # --measure-startup reports relative to this
+
 # ══════════════════════════════════════════════════════════════════════════════
 # IMPORTS
+# pandas and sklearn are imported where they are used (data generation and
+# the training process) so that none of their import time delays startup.
 # ══════════════════════════════════════════════════════════════════════════════
+import io
 import os
+import json
+import atexit
 import sys
+import csv
+import base64
 import pickle
+import queue
 import random
+import shutil
 import logging
 import datetime
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+from collections import OrderedDict
 
+import click
 import numpy as np
-import pandas as pd
 
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import accuracy_score, classification_report
+from ml_engine import (BUNDLE_FILE, BUNDLED, MODEL_FILES, active_model_dir, list_versions,
+                       load_forest, prune_versions, publish_version, read_metadata,
+                       recommendations, set_active, version_dir)
+from training_data import (COLUMNS as TRAINING_COLUMNS, DEFAULT_CHUNK_ROWS, LABELS as TRAINING_LABELS,
+                           performance_labels, training_data_rows, write_chunks,
+                           write_training_data)
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +86,10 @@ class User(UserMixin, db.Model):
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=True)
     created_at    = db.Column(db.DateTime, default=datetime.datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_users_role_department', 'role', 'department_id'),
+    )
+
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
 
@@ -96,6 +120,10 @@ class Student(db.Model):
     department = db.relationship('Department', backref='students')
     results    = db.relationship('Result', backref='student', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_students_department_id', 'department_id'),
+    )
+
 
 class Course(db.Model):
     __tablename__  = 'courses'
@@ -111,6 +139,10 @@ class Course(db.Model):
     department = db.relationship('Department', backref='courses')
     results    = db.relationship('Result', backref='course', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_courses_department_id', 'department_id'),
+    )
+
 
 class Result(db.Model):
     __tablename__ = 'results'
@@ -130,6 +162,15 @@ class Result(db.Model):
 
     lecturer    = db.relationship('User', foreign_keys=[entered_by], backref='entered_results')
 
+    __table_args__ = (
+        # One score per student per course per session; enter_results upserts on it
+        db.Index('uq_results_student_course_session', 'student_id', 'course_id', 'session',
+                 unique=True),
+        db.Index('ix_results_student_session', 'student_id', 'session'),
+        db.Index('ix_results_course_id', 'course_id'),
+        db.Index('ix_results_created_at_id', 'created_at', 'id'),   # keyset paging
+    )
+
 
 class DeleteNotification(db.Model):
     """Tracks deletion requests sent by admin to the owning lecturer."""
@@ -148,6 +189,10 @@ class DeleteNotification(db.Model):
     admin    = db.relationship('User',    foreign_keys=[requested_by])
     lecturer = db.relationship('User',    foreign_keys=[lecturer_id])
 
+    __table_args__ = (
+        db.Index('ix_delete_notifications_status_lecturer', 'status', 'lecturer_id'),
+    )
+
 
 class SessionSummary(db.Model):
     __tablename__  = 'session_summaries'
@@ -163,6 +208,76 @@ class SessionSummary(db.Model):
 
     student = db.relationship('Student', backref='summaries')
 
+    __table_args__ = (
+        db.Index('ix_session_summaries_student_session_semester',
+                 'student_id', 'session', 'semester'),
+    )
+
+
+class StudentTotal(db.Model):
+    """Running credit-unit / grade-point totals across all of a student's results.
+
+    Kept in step with every result insert, update and delete so CGPA can be
+    refreshed without rescanning the results table.
+    """
+    __tablename__  = 'student_totals'
+    student_id     = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    total_units    = db.Column(db.Integer, nullable=False, default=0)
+    total_points   = db.Column(db.Float,   nullable=False, default=0.0)
+    updated_at     = db.Column(db.DateTime, default=datetime.datetime.utcnow,
+                               onupdate=datetime.datetime.utcnow)
+
+
+class StudentFeatures(db.Model):
+    """The model's feature vector (FEATURE_COLS) for each student with results.
+
+    Rewritten in the same transaction as every result insert, update and
+    delete (see refresh_student_features), so scoring reads one row per
+    student instead of rebuilding it from the student's results.
+    """
+    __tablename__        = 'student_features'
+    student_id           = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    avg_score            = db.Column(db.Float, nullable=False)
+    prev_avg_score       = db.Column(db.Float, nullable=False)
+    score_trend          = db.Column(db.Float, nullable=False)
+    score_std            = db.Column(db.Float, nullable=False)
+    failed_courses       = db.Column(db.Float, nullable=False)
+    gpa                  = db.Column(db.Float, nullable=False)
+    pass_rate            = db.Column(db.Float, nullable=False)
+    attendance_rate      = db.Column(db.Float, nullable=False)
+    study_hours_per_week = db.Column(db.Float, nullable=False)
+    num_courses          = db.Column(db.Float, nullable=False)
+    updated_at           = db.Column(db.DateTime, default=datetime.datetime.utcnow,
+                                     onupdate=datetime.datetime.utcnow)
+
+    def vector(self):
+        """This row as a (1, len(FEATURE_COLS)) float64 array."""
+        return np.array([[getattr(self, col) for col in FEATURE_COLS]], dtype=np.float64)
+
+
+class RiskSnapshot(db.Model):
+    """The last model prediction for each student, as shown on /admin/analytics.
+
+    features_updated_at is the student_features.updated_at the row was
+    scored from; a student is rescored only when that no longer matches or
+    model_version is not the active model (see refresh_risk_snapshot).
+    """
+    __tablename__       = 'risk_snapshot'
+    student_id          = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    label               = db.Column(db.String(30), nullable=False, index=True)
+    probabilities       = db.Column(db.Text, nullable=False, default='{}')   # JSON {class: p}
+    model_version       = db.Column(db.String(40), nullable=False)
+    features_updated_at = db.Column(db.DateTime)
+    computed_at         = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+
+# Case-insensitive indexes behind the typeahead prefix searches
+db.Index('ix_students_matric_nocase',    Student.matric_number.collate('NOCASE'))
+db.Index('ix_students_first_name_nocase', Student.first_name.collate('NOCASE'))
+db.Index('ix_students_last_name_nocase',  Student.last_name.collate('NOCASE'))
+db.Index('ix_courses_code_nocase',        Course.course_code.collate('NOCASE'))
+db.Index('ix_courses_title_nocase',       Course.course_title.collate('NOCASE'))
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # GRADING UTILITIES
@@ -228,17 +343,16 @@ def get_class_of_degree(cgpa):
 
 # ══════════════════════════════════════════════════════════════════════════════
 # ML / AI PERFORMANCE ANALYZER
-# ML assets are read from BUNDLE_DIR (packed inside the EXE).
-# Training data CSV is written to BASE_DIR (next to the EXE, writable).
+# The shipped ("bundled") model is read from BUNDLE_DIR (packed inside the EXE).
+# Training data CSV and retrained models are written to BASE_DIR (next to the
+# EXE, writable); retrained models live in a versioned registry there.
 # ══════════════════════════════════════════════════════════════════════════════
-ML_DIR       = os.path.join(BUNDLE_DIR, 'ml_data')
-MODEL_PATH   = os.path.join(ML_DIR, 'performance_model.pkl')
-SCALER_PATH  = os.path.join(ML_DIR, 'scaler.pkl')
-ENCODER_PATH = os.path.join(ML_DIR, 'label_encoder.pkl')
-FEATURE_PATH = os.path.join(ML_DIR, 'feature_names.pkl')
+ML_DIR = os.path.join(BUNDLE_DIR, 'ml_data')
 
 # Writable ML dir (used when re-training or generating new data at runtime)
-ML_DIR_WRITABLE = os.path.join(BASE_DIR, 'ml_data')
+ML_DIR_WRITABLE     = os.path.join(BASE_DIR, 'ml_data')
+ML_REGISTRY_DIR     = os.path.join(ML_DIR_WRITABLE, 'models')
+MODEL_VERSIONS_KEPT = 10
 
 FEATURE_COLS = [
     'avg_score', 'prev_avg_score', 'score_trend', 'score_std',
@@ -246,52 +360,165 @@ FEATURE_COLS = [
     'attendance_rate', 'study_hours_per_week', 'num_courses',
 ]
 
+# Up to this many rows are scored by the flat-array forest (no sklearn call
+# overhead); bigger batches go to sklearn, whose compiled, threaded tree
+# walk wins once there is enough work to amortise that overhead. The
+# sklearn pickle is only loaded the first time such a batch comes along.
+FLAT_FOREST_MAX_ROWS = 256
 
-def _load_ml_artifacts():
+
+def _load_ml_artifacts(model_dir):
+    model_file, scaler_file, encoder_file, _ = MODEL_FILES
     try:
-        with open(MODEL_PATH,   'rb') as f: model   = pickle.load(f)
-        with open(SCALER_PATH,  'rb') as f: scaler  = pickle.load(f)
-        with open(ENCODER_PATH, 'rb') as f: encoder = pickle.load(f)
+        with open(os.path.join(model_dir, model_file),   'rb') as f: model   = pickle.load(f)
+        with open(os.path.join(model_dir, scaler_file),  'rb') as f: scaler  = pickle.load(f)
+        with open(os.path.join(model_dir, encoder_file), 'rb') as f: encoder = pickle.load(f)
         return model, scaler, encoder
     except FileNotFoundError:
         return None, None, None
 
 
+class PerformanceAnalysis:
+    """Everything the analyzer reports for one student, built from one model pass.
+
+    prediction/proba come from a single predict_proba call; trends, metrics
+    and recommendations are derived from them without touching the model
+    again. Produced by PerformanceAnalyzer.analyze().
+    """
+
+    def __init__(self, prediction, proba, trends, metrics=None, recommendations=None):
+        self.prediction      = prediction
+        self.proba           = proba
+        self.trends          = trends
+        self.metrics         = metrics or {}
+        self.recommendations = recommendations or []
+
+    def to_dict(self):
+        return {
+            'prediction':      self.prediction,
+            'proba':           self.proba,
+            'trends':          self.trends,
+            'metrics':         self.metrics,
+            'recommendations': self.recommendations,
+        }
+
+
 class PerformanceAnalyzer:
     """ML-powered performance analysis using a trained Random Forest classifier."""
 
-    def __init__(self):
-        self.model, self.scaler, self.encoder = _load_ml_artifacts()
-        self._ml_ready = all(x is not None for x in [self.model, self.scaler, self.encoder])
+    def __init__(self, model_dir=ML_DIR, version=BUNDLED):
+        self.model_dir   = model_dir
+        self.metadata    = read_metadata(model_dir)
+        self.forest      = load_forest(os.path.join(model_dir, BUNDLE_FILE))
+        self._model_lock = threading.Lock()
+        if self.forest is not None:
+            # Scoring needs nothing but the memory-mapped bundle
+            self.model, self.scaler, self.encoder = None, None, None
+            self._model_checked = False
+            self._ml_ready      = True
+            self._classes, self._labels = self.forest.classes_, self.forest.labels
+        else:
+            # No bundle (an older registry version): fall back to the pickles
+            self.model, self.scaler, self.encoder = _load_ml_artifacts(model_dir)
+            self._model_checked = True
+            self._ml_ready = all(x is not None for x in [self.model, self.scaler, self.encoder])
+            if self._ml_ready:
+                self._classes, self._labels = self.model.classes_, self.encoder.classes_
+        self.version = version if self._ml_ready else None
+
+    def _sklearn_model(self):
+        """The pickled sklearn forest, unpickled the first time a large batch needs it.
+
+        None when the pickle is missing or disagrees with the bundle; an
+        sklearn newer than the pickle can misread its trees, while the
+        bundle's leaf values were normalised when it was exported.
+        """
+        with self._model_lock:
+            if self._model_checked:
+                return self.model
+            self._model_checked = True
+            path = os.path.join(self.model_dir, MODEL_FILES[0])
+            try:
+                with open(path, 'rb') as f:
+                    model = pickle.load(f)
+            except Exception as e:
+                logger.warning(f'Could not load {path}: {e}')
+                return None
+            probe = np.zeros((1, len(FEATURE_COLS)))
+            if not self.forest.matches(model):
+                logger.warning(f'{path} does not match {BUNDLE_FILE}; scoring with the bundle only')
+            elif not np.allclose(self.forest.predict_proba(probe), model.predict_proba(probe)):
+                logger.warning('sklearn disagrees with the model bundle (version skew?); '
+                               'scoring with the bundle only')
+            else:
+                self.model = model
+            return self.model
+
+    def _predict_proba(self, X):
+        if self.forest is not None and (len(X) <= FLAT_FOREST_MAX_ROWS
+                                        or self._sklearn_model() is None):
+            return self.forest.predict_proba(X)
+        return self.model.predict_proba(X)
+
+    def _labels_for(self, probs):
+        """Class names for rows of predict_proba output (RandomForest.predict + decoding)."""
+        return self._labels.take(self._classes.take(np.argmax(probs, axis=1)))
+
+    @staticmethod
+    def _feature_row(student_results, attendance_rate=75.0, study_hours=5.0, out=None):
+        """Write one student's features into out, a float64 row in FEATURE_COLS order.
+
+        Allocates the row when out is None. Values (and their rounding) are
+        exactly what the model was trained on; no pandas objects are built.
+        """
+        if out is None:
+            out = np.empty(len(FEATURE_COLS), dtype=np.float64)
+        n      = len(student_results)
+        scores = np.fromiter((float(r['score']) for r in student_results), np.float64, n)
+        failed = sum(1 for r in student_results if r.get('grade', 'F') == 'F')
+        half   = max(n // 2, 1)
+        prev   = float(scores[:half].mean())
+
+        out[0] = round(scores.mean(), 4)                                    # avg_score
+        out[1] = round(prev, 4)                                             # prev_avg_score
+        out[2] = round(float(scores[-half:].mean()) - prev, 4)              # score_trend
+        out[3] = round(scores.std() if n > 1 else 0.0, 4)                   # score_std
+        out[4] = failed                                                     # failed_courses
+        out[5] = round(float(student_results[-1].get('gpa', 0)), 4)         # gpa
+        out[6] = round((n - failed) / n * 100, 4)                           # pass_rate
+        out[7] = round(attendance_rate, 4)                                  # attendance_rate
+        out[8] = round(study_hours, 4)                                      # study_hours_per_week
+        out[9] = n                                                          # num_courses
+        return out
 
     def _build_feature_vector(self, student_results, attendance_rate=75.0, study_hours=5.0):
         if not student_results:
             return None
-        scores = [float(r['score']) for r in student_results]
-        gpas   = [float(r.get('gpa', 0)) for r in student_results]
-        grades = [r.get('grade', 'F') for r in student_results]
-
-        avg_score      = np.mean(scores)
-        score_std      = np.std(scores) if len(scores) > 1 else 0.0
-        failed_courses = grades.count('F')
-        pass_rate      = (len(grades) - failed_courses) / len(grades) * 100
-        current_gpa    = gpas[-1] if gpas else 0.0
-        half           = max(len(scores) // 2, 1)
-        score_trend    = float(np.mean(scores[-half:])) - float(np.mean(scores[:half]))
-        prev_avg_score = float(np.mean(scores[:half]))
-
-        return pd.DataFrame([{
-            'avg_score':            round(avg_score, 4),
-            'prev_avg_score':       round(prev_avg_score, 4),
-            'score_trend':          round(score_trend, 4),
-            'score_std':            round(score_std, 4),
-            'failed_courses':       failed_courses,
-            'gpa':                  round(current_gpa, 4),
-            'pass_rate':            round(pass_rate, 4),
-            'attendance_rate':      round(attendance_rate, 4),
-            'study_hours_per_week': round(study_hours, 4),
-            'num_courses':          len(scores),
-        }], columns=FEATURE_COLS)
+        X = np.empty((1, len(FEATURE_COLS)), dtype=np.float64)
+        self._feature_row(student_results, attendance_rate, study_hours, out=X[0])
+        return X
+
+    def _build_feature_matrix(self, results_list, attendance_rate=75.0, study_hours=5.0):
+        """One float64 array with a row per non-empty result list, in input order."""
+        X = np.empty((len(results_list), len(FEATURE_COLS)), dtype=np.float64)
+        for row, res in zip(X, results_list):
+            self._feature_row(res, attendance_rate, study_hours, out=row)
+        return X
+
+    def _scale(self, X):
+        """StandardScaler.transform for a plain array.
+
+        The scaler was fitted on a DataFrame, so passing it an ndarray would
+        warn about missing feature names on every call; the arithmetic is
+        the same (X - mean_) / scale_ it performs.
+        """
+        if self.forest is not None:
+            return self.forest.transform(X)
+        if self.scaler.with_mean:
+            X = X - self.scaler.mean_
+        if self.scaler.with_std:
+            X = X / self.scaler.scale_
+        return X
 
     def predict_performance(self, student_results, attendance_rate=75.0, study_hours=5.0):
         if not student_results or len(student_results) < 2:
@@ -300,8 +527,8 @@ class PerformanceAnalyzer:
             return 'Model Not Loaded'
         try:
             X = self._build_feature_vector(student_results, attendance_rate, study_hours)
-            return self.encoder.inverse_transform(
-                self.model.predict(self.scaler.transform(X)))[0]
+            probs = self._predict_proba(self._scale(X))
+            return self._labels_for(probs)[0]
         except Exception as e:
             logger.error(f'predict_performance error: {e}')
             return 'Prediction Error'
@@ -311,12 +538,102 @@ class PerformanceAnalyzer:
             return {}
         try:
             X     = self._build_feature_vector(student_results, attendance_rate, study_hours)
-            probs = self.model.predict_proba(self.scaler.transform(X))[0]
-            return {cls: round(float(p), 4) for cls, p in zip(self.encoder.classes_, probs)}
+            probs = self._predict_proba(self._scale(X))[0]
+            return {cls: round(float(p), 4) for cls, p in zip(self._labels, probs)}
         except Exception as e:
             logger.error(f'predict_performance_proba error: {e}')
             return {}
 
+    def _score(self, student_results, attendance_rate=75.0, study_hours=5.0, features=None):
+        """(prediction, proba) from one predict_proba call.
+
+        Same values predict_performance and predict_performance_proba return,
+        without building the features and running the forest twice. features
+        is the student's precomputed (1, n) feature row, if there is one.
+        """
+        if not student_results:
+            return 'Insufficient Data', {}
+        enough = len(student_results) >= 2
+        if not self._ml_ready:
+            return ('Model Not Loaded' if enough else 'Insufficient Data'), {}
+        try:
+            X     = features if features is not None else \
+                    self._build_feature_vector(student_results, attendance_rate, study_hours)
+            probs = self._predict_proba(self._scale(X))[0]
+        except Exception as e:
+            logger.error(f'_score error: {e}')
+            return ('Prediction Error' if enough else 'Insufficient Data'), {}
+        proba = {cls: round(float(p), 4) for cls, p in zip(self._labels, probs)}
+        if not enough:
+            return 'Insufficient Data', proba
+        label = self._labels_for(probs[np.newaxis])[0]
+        return label, proba
+
+    def analyze(self, student_results, current_gpa=0.0, attendance_rate=75.0, study_hours=5.0,
+                features=None):
+        """Full analysis for one student with a single model pass."""
+        prediction, proba = self._score(student_results, attendance_rate, study_hours, features)
+        analysis = PerformanceAnalysis(prediction, proba, self.analyze_trends(student_results))
+        analysis.metrics         = self.calculate_performance_metrics(student_results, analysis)
+        analysis.recommendations = self.generate_recommendations(
+            student_results, current_gpa, attendance_rate, study_hours, analysis)
+        return analysis
+
+    def predict_performance_batch(self, all_students_results,
+                                  attendance_rate=75.0, study_hours=5.0):
+        """Score many students with a single feature matrix and predict_proba.
+
+        all_students_results: {student_id: [result dicts]}.
+        Returns {student_id: {'prediction': label, 'proba': {class: p}}}; labels
+        match what predict_performance returns for each student individually.
+        """
+        ids = [sid for sid, res in all_students_results.items() if res]
+        try:
+            X = self._build_feature_matrix(
+                [all_students_results[sid] for sid in ids], attendance_rate, study_hours)
+        except Exception as e:
+            logger.error(f'predict_performance_batch error: {e}')
+            X = None
+        scored = {sid: {'prediction': 'Insufficient Data', 'proba': {}}
+                  for sid in all_students_results}
+        if X is None:
+            scored.update((sid, {'prediction': 'Prediction Error', 'proba': {}}) for sid in ids
+                          if len(all_students_results[sid]) >= 2)
+        else:
+            scored.update(self.predict_feature_batch(ids, X))
+        return scored
+
+    def predict_feature_batch(self, student_ids, X):
+        """predict_performance_batch for feature rows already built (X[i] is student_ids[i])."""
+        scored   = {}
+        eligible = []
+        n_col    = FEATURE_COLS.index('num_courses')
+        for i, sid in enumerate(student_ids):
+            if X[i, n_col] < 2:
+                scored[sid] = {'prediction': 'Insufficient Data', 'proba': {}}
+            elif not self._ml_ready:
+                scored[sid] = {'prediction': 'Model Not Loaded', 'proba': {}}
+            else:
+                eligible.append(i)
+        if not eligible:
+            return scored
+
+        try:
+            probs   = self._predict_proba(self._scale(X[eligible]))
+            # RandomForestClassifier.predict is classes_[argmax(predict_proba)]
+            labels  = self._labels_for(probs)
+            classes = list(self._labels)
+            for i, label, row in zip(eligible, labels, probs):
+                scored[student_ids[i]] = {
+                    'prediction': label,
+                    'proba':      {cls: round(float(p), 4) for cls, p in zip(classes, row)},
+                }
+        except Exception as e:
+            logger.error(f'predict_feature_batch error: {e}')
+            for i in eligible:
+                scored[student_ids[i]] = {'prediction': 'Prediction Error', 'proba': {}}
+        return scored
+
     def analyze_trends(self, student_results):
         if not student_results:
             return {'trend': 'No Data', 'improvement': 0, 'consistency': 0, 'average_score': 0}
@@ -339,54 +656,28 @@ class PerformanceAnalyzer:
         }
 
     def identify_at_risk_students(self, all_students_results):
-        return [sid for sid, res in all_students_results.items()
-                if res and len(res) >= 2 and self.predict_performance(res) == 'At-Risk']
+        scored = self.predict_performance_batch(all_students_results)
+        return [sid for sid in all_students_results
+                if scored[sid]['prediction'] == 'At-Risk']
 
     def generate_recommendations(self, student_results, current_gpa,
-                                  attendance_rate=75.0, study_hours=5.0):
+                                  attendance_rate=75.0, study_hours=5.0, analysis=None):
         if not student_results:
             return ['Insufficient data for recommendations.']
-        prediction   = self.predict_performance(student_results, attendance_rate, study_hours)
-        proba        = self.predict_performance_proba(student_results, attendance_rate, study_hours)
+        if analysis is not None:
+            prediction, proba = analysis.prediction, analysis.proba
+        else:
+            prediction, proba = self._score(student_results, attendance_rate, study_hours)
         failed_count = [r.get('grade', '') for r in student_results].count('F')
+        return recommendations(prediction, proba, failed_count, current_gpa)
 
-        advice = {
-            'Excellent': [
-                'ML Analysis: Excellent performance — keep up the outstanding work!',
-                'Consider mentoring peers to reinforce and deepen your knowledge.',
-            ],
-            'Good': [
-                'ML Analysis: Good performance. Focus on maintaining consistency.',
-                'Target weak areas to move from Good to Excellent standing.',
-            ],
-            'Average': [
-                'ML Analysis: Average performance. Increase study time and seek help proactively.',
-                'Join study groups and utilise office hours for challenging topics.',
-            ],
-            'At-Risk': [
-                'WARNING - ML Analysis: You are academically at risk. Seek immediate academic support.',
-                'Meet with your lecturer and academic advisor as soon as possible.',
-                'Consider enrolling in the university study-skills and time-management workshop.',
-            ],
-        }
-        recs = list(advice.get(prediction, ['Prediction unavailable.']))
-        if proba:
-            conf = proba.get(prediction, 0)
-            if conf < 0.6:
-                recs.append(f'Note: Prediction confidence is {conf*100:.0f}%. '
-                            'Submit more results for a more reliable analysis.')
-        if failed_count > 0:
-            recs.append(f'You have {failed_count} failed course(s). '
-                        'Plan retakes and dedicate extra time to those subjects.')
-        if current_gpa < 2.0:
-            recs.append('Your GPA is below 2.0 — urgent action required to avoid academic probation.')
-        elif current_gpa >= 4.5:
-            recs.append('First Class standing! Maintain this excellence for graduation honours.')
-        return recs
-
-    def calculate_performance_metrics(self, results):
+    def calculate_performance_metrics(self, results, analysis=None):
         if not results:
             return {}
+        if analysis is not None:
+            prediction, proba = analysis.prediction, analysis.proba
+        else:
+            prediction, proba = self._score(results)
         scores = [r['score'] for r in results]
         grades = [r.get('grade', '') for r in results]
         return {
@@ -398,12 +689,77 @@ class PerformanceAnalyzer:
             'standard_deviation': round(float(np.std(scores)), 2),
             'passed_courses':     sum(1 for g in grades if g != 'F'),
             'failed_courses':     grades.count('F'),
-            'ml_prediction':      self.predict_performance(results),
-            'ml_confidence':      self.predict_performance_proba(results),
+            'ml_prediction':      prediction,
+            'ml_confidence':      proba,
             'grade_distribution': {g: grades.count(g) for g in ['A', 'B', 'C', 'D', 'E', 'F']},
         }
 
 
+class PredictionCache:
+    """Bounded, thread-safe LRU cache of PerformanceAnalysis objects with a TTL.
+
+    Holds one entry per student together with the fingerprint of the results
+    it was computed from and the model version. A lookup only hits when both
+    still match, so a missed invalidation can never serve a stale analysis;
+    writes call invalidate() so the slot is freed straight away.
+    """
+
+    def __init__(self, maxsize=2048, ttl=600):
+        self.maxsize  = maxsize
+        self.ttl      = ttl
+        self._entries = OrderedDict()   # student_id -> (fingerprint, version, expires, analysis)
+        self._lock    = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    @staticmethod
+    def fingerprint(student_results, *extra):
+        return hash((tuple((r['score'], r.get('grade'), r.get('gpa', 0))
+                           for r in student_results), extra))
+
+    def get(self, student_id, fingerprint, version):
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry and entry[:2] == (fingerprint, version) and entry[2] > time.monotonic():
+                self._entries.move_to_end(student_id)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+            return None
+
+    def put(self, student_id, fingerprint, version, analysis):
+        with self._lock:
+            self._entries[student_id] = (fingerprint, version, time.monotonic() + self.ttl, analysis)
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *student_ids):
+        with self._lock:
+            for sid in student_ids:
+                if self._entries.pop(int(sid), None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size':          len(self._entries),
+                'maxsize':       self.maxsize,
+                'ttl':           self.ttl,
+                'hits':          self.hits,
+                'misses':        self.misses,
+                'hit_rate':      round(self.hits / lookups * 100, 1) if lookups else None,
+                'evictions':     self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # FLASK APP + EXTENSIONS
 # template_folder and static_folder point to BUNDLE_DIR so PyInstaller can
@@ -420,13 +776,123 @@ app.config['SECRET_KEY']                  = 'adeleke-ars-secret-key-2024'
 app.config['SQLALCHEMY_DATABASE_URI']     = 'sqlite:///' + os.path.join(BASE_DIR, 'result_management.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# SQLite connection profile — applied to every new pooled connection.
+# WAL lets readers run alongside the single writer, and busy_timeout makes a
+# writer wait for the lock instead of failing with "database is locked".
+app.config['SQLITE_JOURNAL_MODE']    = 'WAL'
+app.config['SQLITE_SYNCHRONOUS']     = 'NORMAL'      # safe with WAL, far fewer fsyncs
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = 15000
+app.config['SQLITE_CACHE_SIZE_KB']   = 64 * 1024     # page cache per connection
+app.config['SQLITE_MMAP_SIZE']       = 256 * 1024 * 1024
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size':     10,
+    'max_overflow':  20,
+    'pool_timeout':  30,
+    'pool_recycle':  3600,
+    'connect_args':  {'timeout': 15, 'check_same_thread': False},
+}
+# Dashboard analyses are cached per student until their results or the model change
+app.config['PREDICTION_CACHE_SIZE'] = 2048
+app.config['PREDICTION_CACHE_TTL']  = 600          # seconds
+# Largest synthetic dataset /admin/ml/generate will write (generate_training_data.py has no cap)
+app.config['ML_GENERATE_MAX_ROWS']  = 1_000_000
+# The at-risk snapshot is brought up to date this often (seconds; 0 disables
+# the background thread), and RISK_SNAPSHOT_DEBOUNCE seconds after a write
+app.config['RISK_SNAPSHOT_INTERVAL'] = 300
+app.config['RISK_SNAPSHOT_DEBOUNCE'] = 2.0
+# Any of the above can be overridden with FLASK_<KEY> environment variables
+app.config.from_prefixed_env()
+
 db.init_app(app)
 
+
+def _apply_sqlite_profile(dbapi_connection, connection_record):
+    cfg    = app.config
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={cfg['SQLITE_JOURNAL_MODE']}")
+    cursor.execute(f"PRAGMA synchronous={cfg['SQLITE_SYNCHRONOUS']}")
+    cursor.execute(f"PRAGMA busy_timeout={int(cfg['SQLITE_BUSY_TIMEOUT_MS'])}")
+    cursor.execute(f"PRAGMA cache_size={-int(cfg['SQLITE_CACHE_SIZE_KB'])}")
+    cursor.execute(f"PRAGMA mmap_size={int(cfg['SQLITE_MMAP_SIZE'])}")
+    cursor.close()
+
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', _apply_sqlite_profile)
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-ai_analyzer = PerformanceAnalyzer()
+prediction_cache = PredictionCache(app.config['PREDICTION_CACHE_SIZE'],
+                                   app.config['PREDICTION_CACHE_TTL'])
+
+
+# ── Active model ──────────────────────────────────────────────────────────
+# ai_analyzer is only ever replaced by a fully loaded analyzer, under
+# _analyzer_lock, and model directories are immutable, so a request that
+# took get_analyzer() keeps a complete model even while a swap happens.
+# In the server the first one is loaded on a background thread (see
+# start_background_workers) so pages that need no model are served
+# straight away; a request that needs it before then
+# waits for that load instead of starting another.
+_analyzer_lock  = threading.Lock()
+ai_analyzer     = None
+model_loaded_at = None   # seconds after _STARTED, for --measure-startup
+
+
+def _load_active_analyzer():
+    version, path = active_model_dir(ML_REGISTRY_DIR, ML_DIR)
+    return PerformanceAnalyzer(path, version)
+
+
+def _load_initial_analyzer():
+    global ai_analyzer, model_loaded_at
+    with _analyzer_lock:
+        if ai_analyzer is None:
+            ai_analyzer     = _load_active_analyzer()
+            model_loaded_at = time.perf_counter() - _STARTED
+
+
+def get_analyzer():
+    """The analyzer for the active model; fetch it once per request."""
+    if ai_analyzer is None:
+        _load_initial_analyzer()
+    return ai_analyzer
+
+
+def activate_model(version):
+    """Load a registered version, point ACTIVE at it and swap it in."""
+    global ai_analyzer
+    analyzer = PerformanceAnalyzer(version_dir(ML_REGISTRY_DIR, version, ML_DIR), version)
+    if not analyzer._ml_ready:
+        raise ValueError(f'Model version {version} could not be loaded.')
+    with _analyzer_lock:
+        set_active(ML_REGISTRY_DIR, version)
+        ai_analyzer = analyzer
+        prediction_cache.clear()
+    risk_snapshot_due.set()
+    return analyzer
+
+
+def cached_analysis(student_id, result_data, current_gpa=0.0):
+    """get_analyzer().analyze() for one student, served from prediction_cache when fresh.
+
+    The model input is read from student_features rather than rebuilt from
+    result_data when the student has a feature row. The cache keeps one
+    entry per student, so every page should pass the inputs
+    student_analysis_inputs() gives rather than its own variant of them.
+    """
+    analyzer    = get_analyzer()
+    fingerprint = PredictionCache.fingerprint(result_data, current_gpa)
+    analysis    = prediction_cache.get(student_id, fingerprint, analyzer.version)
+    if analysis is None:
+        stored   = db.session.get(StudentFeatures, student_id)
+        features = stored.vector() if stored is not None else None
+        analysis = analyzer.analyze(result_data, current_gpa, features=features)
+        prediction_cache.put(student_id, fingerprint, analyzer.version, analysis)
+    return analysis
 
 
 @login_manager.user_loader
@@ -438,9 +904,26 @@ def load_user(user_id):
 # AUTO-SEED DATABASE ON FIRST RUN
 # ══════════════════════════════════════════════════════════════════════════════
 
+def _migrate_indexes():
+    """Add indexes declared on the models that an older database is missing.
+
+    create_all() only builds indexes together with brand-new tables, so
+    databases created before an index was declared get it here. A unique
+    index that existing duplicate rows would violate is skipped with a
+    warning rather than deleting data.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=db.engine, checkfirst=True)
+            except Exception as e:
+                logger.warning(f'Could not create index {index.name}: {e}')
+
+
 def _seed_defaults():
     """Create all tables and populate with seed data if the DB is brand new."""
     db.create_all()
+    _migrate_indexes()
     if User.query.count() > 0:
         return   # Already seeded — skip
 
@@ -530,15 +1013,24 @@ def _seed_defaults():
     db.session.commit()
 
 
-with app.app_context():
-    _seed_defaults()
-
-
 # ══════════════════════════════════════════════════════════════════════════════
-# HELPER: Recalculate GPA/CGPA after a result is entered
+# HELPER: Keep GPA/CGPA current as results are entered, edited and deleted
 # ══════════════════════════════════════════════════════════════════════════════
 
-def update_student_summary(student_id, session, semester):
+def _scan_totals(student_id, session=None, semester=None):
+    """(total_units, total_points) computed straight from the results table."""
+    query = db.session.query(
+        db.func.coalesce(db.func.sum(Course.credit_unit), 0),
+        db.func.coalesce(db.func.sum(Result.grade_point * Course.credit_unit), 0.0),
+    ).select_from(Result).join(Course).filter(Result.student_id == student_id)
+    if session is not None:
+        query = query.filter(Result.session == session, Course.semester == semester)
+    units, points = query.one()
+    return int(units), float(points)
+
+
+def _full_scan_summary(student_id, session, semester):
+    """Reference GPA/CGPA computation that rescans every relevant result."""
     results      = db.session.query(Result, Course).join(Course).filter(
         Result.student_id == student_id,
         Result.session    == session,
@@ -552,20 +1044,576 @@ def update_student_summary(student_id, session, semester):
     all_results  = db.session.query(Result, Course).join(Course).filter(
         Result.student_id == student_id).all()
     cgpa = calculate_cgpa([(c.credit_unit, r.grade_point) for r, c in all_results])
+    return total_units, total_points, gpa, cgpa
+
+
+def apply_result_change(student_id, session, semester, credit_unit,
+                        old_point=None, new_point=None, commit=True, features=True):
+    """Fold one result insert/update/delete into the running GPA and CGPA totals.
+
+    old_point is the grade point before the change (None for an insert) and
+    new_point the grade point after it (None for a delete). Call this after
+    the Result row itself has been added, changed or deleted in the session.
+    A student or semester seen for the first time is seeded from a scan,
+    which already includes the change; after that every write is O(1).
+    The student's feature row is refreshed too unless features is False
+    (bulk writers refresh all their students at once instead).
+    """
+    d_units  = (credit_unit if new_point is not None else 0) \
+             - (credit_unit if old_point is not None else 0)
+    d_points = (new_point or 0.0) * credit_unit - (old_point or 0.0) * credit_unit
+    db.session.flush()
+
+    totals = db.session.get(StudentTotal, student_id)
+    if totals is None:
+        units, points = _scan_totals(student_id)
+        totals = StudentTotal(student_id=student_id, total_units=units, total_points=points)
+        db.session.add(totals)
+    else:
+        totals.total_units  += d_units
+        totals.total_points += d_points
 
     summary = SessionSummary.query.filter_by(
         student_id=student_id, session=session, semester=semester).first()
-    if summary:
-        summary.total_units  = total_units
-        summary.total_points = total_points
-        summary.gpa          = gpa
-        summary.cgpa         = cgpa
+    if summary is None:
+        units, points = _scan_totals(student_id, session, semester)
+        summary = SessionSummary(student_id=student_id, session=session, semester=semester,
+                                 total_units=units, total_points=points)
+        db.session.add(summary)
     else:
-        db.session.add(SessionSummary(
-            student_id=student_id, session=session, semester=semester,
-            total_units=total_units, total_points=total_points, gpa=gpa, cgpa=cgpa,
-        ))
+        summary.total_units  = (summary.total_units  or 0)   + d_units
+        summary.total_points = (summary.total_points or 0.0) + d_points
+
+    summary.gpa  = round(summary.total_points / summary.total_units, 2) if summary.total_units else 0.0
+    summary.cgpa = round(totals.total_points / totals.total_units, 2) if totals.total_units else 0.0
+    if features:
+        refresh_student_features([student_id])
+    if commit:
+        db.session.commit()
+
+
+def rebuild_student_summaries(student_ids=None, verify=True, commit=True):
+    """Recompute semester summaries and running totals from the results table.
+
+    Repairs any drift in the incrementally maintained values (e.g. after a
+    course's credit unit or semester was edited) and creates missing rows;
+    the report counts the two separately ('drifted', 'created'). Aggregates
+    are computed with grouped queries; when verify is set every rebuilt
+    summary is then checked against _full_scan_summary. Returns a report dict.
+    """
+    sem_query = db.session.query(
+        Result.student_id, Result.session, Course.semester,
+        db.func.sum(Course.credit_unit),
+        db.func.sum(Result.grade_point * Course.credit_unit),
+    ).join(Course).group_by(Result.student_id, Result.session, Course.semester)
+    tot_query = db.session.query(
+        Result.student_id,
+        db.func.sum(Course.credit_unit),
+        db.func.sum(Result.grade_point * Course.credit_unit),
+    ).join(Course).group_by(Result.student_id)
+    sum_query = SessionSummary.query.order_by(SessionSummary.id)
+    totals_q  = StudentTotal.query
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        sem_query = sem_query.filter(Result.student_id.in_(student_ids))
+        tot_query = tot_query.filter(Result.student_id.in_(student_ids))
+        sum_query = sum_query.filter(SessionSummary.student_id.in_(student_ids))
+        totals_q  = totals_q.filter(StudentTotal.student_id.in_(student_ids))
+
+    semesters = {(sid, sess, sem): (int(u), float(p)) for sid, sess, sem, u, p in sem_query}
+    overall   = {sid: (int(u), float(p)) for sid, u, p in tot_query}
+
+    drifted = created = 0
+    totals  = {t.student_id: t for t in totals_q}
+    for sid in set(totals) | set(overall):
+        units, points = overall.get(sid, (0, 0.0))
+        row = totals.get(sid)
+        if row is None:
+            totals[sid] = StudentTotal(student_id=sid, total_units=units, total_points=points)
+            db.session.add(totals[sid])
+            created += 1
+        elif (row.total_units, row.total_points) != (units, points):
+            drifted += 1
+            row.total_units, row.total_points = units, points
+
+    # Same row apply_result_change updates: the first per key
+    summaries = {}
+    for summary in sum_query:
+        summaries.setdefault((summary.student_id, summary.session, summary.semester), summary)
+    for key in set(summaries) | set(semesters):
+        sid, sess, sem = key
+        units, points = semesters.get(key, (0, 0.0))
+        t_units, t_points = overall.get(sid, (0, 0.0))
+        values  = (units, points,
+                   round(points / units, 2) if units else 0.0,
+                   round(t_points / t_units, 2) if t_units else 0.0)
+        summary = summaries.get(key)
+        if summary is None:
+            summary = SessionSummary(student_id=sid, session=sess, semester=sem)
+            db.session.add(summary)
+            summaries[key] = summary
+            created += 1
+        elif (summary.total_units, summary.total_points, summary.gpa) != values[:3]:
+            drifted += 1
+        # cgpa is a snapshot taken when the summary was last written, so
+        # older semesters lag behind; refreshing it is not counted as drift
+        summary.total_units, summary.total_points, summary.gpa, summary.cgpa = values
+    if commit:
+        db.session.commit()
+    else:
+        db.session.flush()
+
+    mismatches = []
+    if verify:
+        for (sid, sess, sem), summary in summaries.items():
+            expected = _full_scan_summary(sid, sess, sem)
+            if (summary.total_units, summary.total_points, summary.gpa, summary.cgpa) != expected:
+                mismatches.append({'student_id': sid, 'session': sess, 'semester': sem})
+    return {
+        'summaries':  len(summaries),
+        'totals':     len(totals),
+        'drifted':    drifted,
+        'created':    created,
+        'verified':   verify,
+        'mismatches': mismatches,
+    }
+
+
+def cascade_delete(student_ids=None, course_ids=None):
+    """Delete students and/or courses together with everything that hangs off them.
+
+    student_ids / course_ids may be lists or SELECTs of ids. Every table is
+    cleared with one set-based DELETE ... WHERE ... IN (subquery) rather
+    than row-by-row ORM deletes, and students outside the deleted set who
+    lose results (because a course went) get their summaries rebuilt.
+    Does not commit; returns {table: rows deleted}.
+    """
+    def _ids(ids):
+        if ids is None:
+            return []
+        return list(ids) if isinstance(ids, (list, tuple, set)) else ids
+
+    students, courses = _ids(student_ids), _ids(course_ids)
+    result_ids = db.select(Result.id).where(db.or_(
+        Result.student_id.in_(students), Result.course_id.in_(courses)))
+
+    survivors = [sid for (sid,) in db.session.query(Result.student_id).filter(
+        Result.course_id.in_(courses), Result.student_id.not_in(students)).distinct()]
+
+    def _delete(query):
+        return query.delete(synchronize_session=False)
+
+    counts = {}
+    counts['delete_notifications'] = _delete(DeleteNotification.query.filter(
+        DeleteNotification.result_id.in_(result_ids)))
+    counts['results'] = _delete(Result.query.filter(db.or_(
+        Result.student_id.in_(students), Result.course_id.in_(courses))))
+    counts['session_summaries'] = _delete(SessionSummary.query.filter(
+        SessionSummary.student_id.in_(students)))
+    counts['student_totals'] = _delete(StudentTotal.query.filter(
+        StudentTotal.student_id.in_(students)))
+    counts['student_features'] = _delete(StudentFeatures.query.filter(
+        StudentFeatures.student_id.in_(students)))
+    counts['risk_snapshot'] = _delete(RiskSnapshot.query.filter(
+        RiskSnapshot.student_id.in_(students)))
+    counts['users'] = _delete(User.query.filter(User.id.in_(
+        db.select(Student.user_id).where(Student.id.in_(students)))))
+    counts['students'] = _delete(Student.query.filter(Student.id.in_(students)))
+    counts['courses']  = _delete(Course.query.filter(Course.id.in_(courses)))
+
+    if survivors:
+        rebuild_student_summaries(survivors, verify=False, commit=False)
+        refresh_student_features(survivors)
+    db.session.expire_all()
+    return counts
+
+
+def _describe_counts(counts):
+    labels = [('students', 'student', 'students'), ('courses', 'course', 'courses'),
+              ('results', 'result', 'results'),
+              ('session_summaries', 'GPA summary', 'GPA summaries'),
+              ('student_totals', 'CGPA total', 'CGPA totals'),
+              ('student_features', 'feature row', 'feature rows'),
+              ('risk_snapshot', 'risk score', 'risk scores'),
+              ('users', 'login', 'logins'),
+              ('delete_notifications', 'deletion request', 'deletion requests')]
+    parts = [f'{counts[key]} {one if counts[key] == 1 else many}'
+             for key, one, many in labels if counts.get(key)]
+    return ', '.join(parts) or 'no related rows'
+
+
+@app.cli.command('rebuild-summaries')
+@click.option('--no-verify', is_flag=True, help='Skip the full-scan cross-check.')
+def rebuild_summaries_command(no_verify):
+    """Rebuild GPA/CGPA summaries and running totals from the results table."""
+    report = rebuild_student_summaries(verify=not no_verify)
+    click.echo(f"Rebuilt {report['summaries']} summaries and {report['totals']} student totals "
+               f"({report['drifted']} rows repaired, "
+               f"{report['created']} missing rows created).")
+    if report['verified']:
+        if report['mismatches']:
+            for m in report['mismatches']:
+                click.echo(f"  MISMATCH student={m['student_id']} "
+                           f"{m['session']} {m['semester']}", err=True)
+            raise SystemExit(1)
+        click.echo('All summaries match the full-scan computation.')
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# HELPER: Load every student's results for the analyzer in one query
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _first_session_summary():
+    """Subquery of the lowest SessionSummary id per (student_id, session)."""
+    return db.session.query(
+        SessionSummary.student_id.label('student_id'),
+        SessionSummary.session.label('session'),
+        db.func.min(SessionSummary.id).label('summary_id'),
+    ).group_by(SessionSummary.student_id, SessionSummary.session).subquery()
+
+
+def latest_cgpa_subquery():
+    """Subquery of (student_id, cgpa) from each student's most recent
+    SessionSummary, the CGPA the student dashboard shows."""
+    ranked = db.session.query(
+        SessionSummary.student_id.label('student_id'),
+        SessionSummary.cgpa.label('cgpa'),
+        db.func.row_number().over(
+            partition_by=SessionSummary.student_id,
+            order_by=(SessionSummary.created_at.desc(), SessionSummary.id.desc()),
+        ).label('recency'),
+    ).subquery()
+    return db.session.query(ranked.c.student_id, ranked.c.cgpa)\
+        .filter(ranked.c.recency == 1).subquery()
+
+
+def student_analysis_inputs(student_id):
+    """(result_data, cgpa) for cached_analysis: the student's
+    load_results_by_student list and the CGPA of their latest summary."""
+    latest = latest_cgpa_subquery()
+    cgpa   = db.session.query(latest.c.cgpa).filter(latest.c.student_id == student_id).scalar()
+    return load_results_by_student([student_id]).get(student_id, []), cgpa or 0.0
+
+
+def load_results_by_student(student_ids=None):
+    """Return {student_id: [{'score', 'grade', 'gpa'}, ...]} for the analyzer.
+
+    Results are joined to the GPA of their (student, session) summary — the
+    lowest-id summary row, which is what a per-result
+    SessionSummary.query.filter_by(...).first() used to return — so the
+    whole cohort is loaded in a single statement instead of one query per
+    student plus one per result.
+    """
+    first_summary = _first_session_summary()
+    query = db.session.query(Result.student_id, Result.score, Result.grade, SessionSummary.gpa)\
+        .outerjoin(first_summary, db.and_(first_summary.c.student_id == Result.student_id,
+                                          first_summary.c.session    == Result.session))\
+        .outerjoin(SessionSummary, SessionSummary.id == first_summary.c.summary_id)
+    if student_ids is not None:
+        query = query.filter(Result.student_id.in_(student_ids))
+
+    grouped = {}
+    for student_id, score, grade, gpa in query.order_by(Result.student_id, Result.id):
+        grouped.setdefault(student_id, []).append({
+            'score': score,
+            'grade': grade,
+            'gpa':   gpa if gpa is not None else 0,
+        })
+    return grouped
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# HELPER: Materialised per-student features (student_features)
+# ══════════════════════════════════════════════════════════════════════════════
+FEATURE_REFRESH_CHUNK = 500   # students per IN (...) when rebuilding many
+
+
+def refresh_student_features(student_ids=None):
+    """Rewrite the student_features rows of student_ids (all students when None).
+
+    Features come from the same result lists load_results_by_student gives
+    the analyzer, so a stored row equals what the analyzer would build.
+    Students left without results lose their row. Does not commit; returns
+    the number of rows written.
+    """
+    if student_ids is None:
+        student_ids = [sid for (sid,) in db.session.query(Student.id)]
+    student_ids = sorted({int(sid) for sid in student_ids})
+    written = 0
+    for i in range(0, len(student_ids), FEATURE_REFRESH_CHUNK):
+        chunk    = student_ids[i:i + FEATURE_REFRESH_CHUNK]
+        results  = load_results_by_student(chunk)
+        existing = {f.student_id: f for f in
+                    StudentFeatures.query.filter(StudentFeatures.student_id.in_(chunk))}
+        row      = np.empty(len(FEATURE_COLS), dtype=np.float64)
+        for sid in chunk:
+            if not results.get(sid):
+                if sid in existing:
+                    db.session.delete(existing[sid])
+                continue
+            PerformanceAnalyzer._feature_row(results[sid], out=row)
+            features = existing.get(sid) or StudentFeatures(student_id=sid)
+            for col, value in zip(FEATURE_COLS, row.tolist()):
+                setattr(features, col, value)
+            db.session.add(features)
+            written += 1
+    db.session.flush()
+    db.session.info['risk_snapshot_due'] = True
+    return written
+
+
+def load_student_features(student_ids=None):
+    """(student ids, float64 matrix in FEATURE_COLS order) from student_features."""
+    query = db.session.query(StudentFeatures.student_id,
+                             *[getattr(StudentFeatures, col) for col in FEATURE_COLS])
+    if student_ids is not None:
+        query = query.filter(StudentFeatures.student_id.in_(list(student_ids)))
+    rows = query.order_by(StudentFeatures.student_id).all()
+    X    = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(FEATURE_COLS))
+    return [row[0] for row in rows], X
+
+
+def _backfill_student_features():
+    """Build the missing rows of students who have results but no feature row
+    (a database from before student_features existed, or seeded data)."""
+    missing = [sid for (sid,) in db.session.query(Result.student_id).distinct()
+               .filter(Result.student_id.not_in(db.select(StudentFeatures.student_id)))]
+    if missing:
+        refresh_student_features(missing)
+        db.session.commit()
+
+
+@app.cli.command('rebuild-features')
+def rebuild_features_command():
+    """Rebuild every student's row in student_features from the results table."""
+    written = refresh_student_features()
     db.session.commit()
+    click.echo(f'Rebuilt feature rows for {written} students.')
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# HELPER: At-risk snapshot (risk_snapshot)
+# ══════════════════════════════════════════════════════════════════════════════
+# Set after a commit that changed student_features and after a model swap;
+# the snapshot thread then rescores the changed students without waiting for
+# its next scheduled run.
+risk_snapshot_due = threading.Event()
+
+
+@event.listens_for(db.session, 'after_commit')
+def _signal_risk_snapshot(session):
+    if session.info.pop('risk_snapshot_due', False):
+        risk_snapshot_due.set()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_risk_snapshot(session):
+    session.info.pop('risk_snapshot_due', None)
+
+
+def _stale_risk_students(version):
+    """Query of student ids whose snapshot row is missing, from an older
+    feature row or from another model version."""
+    return db.session.query(StudentFeatures.student_id)\
+        .outerjoin(RiskSnapshot, RiskSnapshot.student_id == StudentFeatures.student_id)\
+        .filter(db.or_(RiskSnapshot.student_id.is_(None),
+                       RiskSnapshot.model_version != version,
+                       RiskSnapshot.features_updated_at.is_(None),
+                       RiskSnapshot.features_updated_at != StudentFeatures.updated_at))
+
+
+def refresh_risk_snapshot():
+    """Rescore only the students whose snapshot is stale and commit.
+
+    Every student is stale after a model swap. Rows of students who no longer
+    have a feature row are dropped. Returns the number of students rescored,
+    or None when no model is loaded.
+    """
+    analyzer = get_analyzer()
+    if not analyzer._ml_ready:
+        return None
+    version = analyzer.version
+    db.session.query(RiskSnapshot)\
+        .filter(RiskSnapshot.student_id.not_in(db.select(StudentFeatures.student_id)))\
+        .delete(synchronize_session=False)
+
+    stale    = [sid for (sid,) in _stale_risk_students(version)]
+    rescored = 0
+    for i in range(0, len(stale), FEATURE_REFRESH_CHUNK):
+        chunk    = stale[i:i + FEATURE_REFRESH_CHUNK]
+        rows     = StudentFeatures.query.filter(StudentFeatures.student_id.in_(chunk))\
+            .order_by(StudentFeatures.student_id).all()
+        ids      = [f.student_id for f in rows]
+        X        = np.array([[getattr(f, col) for col in FEATURE_COLS] for f in rows],
+                            dtype=np.float64).reshape(len(rows), len(FEATURE_COLS))
+        scored   = analyzer.predict_feature_batch(ids, X)
+        existing = {r.student_id: r for r in
+                    RiskSnapshot.query.filter(RiskSnapshot.student_id.in_(ids))}
+        now      = datetime.datetime.utcnow()
+        for f in rows:
+            snap = existing.get(f.student_id) or RiskSnapshot(student_id=f.student_id)
+            snap.label               = scored[f.student_id]['prediction']
+            snap.probabilities       = json.dumps(scored[f.student_id]['proba'])
+            snap.model_version       = version
+            snap.features_updated_at = f.updated_at
+            snap.computed_at         = now
+            db.session.add(snap)
+        rescored += len(rows)
+    db.session.commit()
+    return rescored
+
+
+def model_state():
+    """'ready', 'loading' (the server's background load is under way),
+    'not loaded' (nothing has loaded it yet) or 'unavailable' (it failed)."""
+    analyzer = ai_analyzer
+    if analyzer is None:
+        return 'loading' if _analyzer_lock.locked() else 'not loaded'
+    return 'ready' if analyzer._ml_ready else 'unavailable'
+
+
+def risk_snapshot_status():
+    """Freshness of the snapshot for the analytics page."""
+    analyzer = ai_analyzer
+    oldest, newest, rows = db.session.query(db.func.min(RiskSnapshot.computed_at),
+                                            db.func.max(RiskSnapshot.computed_at),
+                                            db.func.count(RiskSnapshot.student_id)).one()
+    return {
+        'rows':          rows,
+        'oldest':        oldest,
+        'newest':        newest,
+        'stale':         _stale_risk_students(analyzer.version).count()
+                         if analyzer is not None and analyzer._ml_ready else None,
+        'model_version': analyzer.version if analyzer is not None else None,
+        'model_state':   model_state(),
+    }
+
+
+def _risk_snapshot_worker(interval, debounce):
+    """Refresh at startup, then every interval seconds or soon after a write."""
+    while True:
+        risk_snapshot_due.clear()
+        try:
+            with app.app_context():
+                rescored = refresh_risk_snapshot()
+            if rescored:
+                logger.info(f'Risk snapshot: rescored {rescored} students')
+        except Exception as e:
+            logger.error(f'Risk snapshot refresh failed: {e}')
+        if risk_snapshot_due.wait(interval):
+            # let a burst of writes (a bulk upload, several entries) land first
+            time.sleep(debounce)
+
+
+@app.cli.command('refresh-risk')
+def refresh_risk_command():
+    """Rescore the students whose at-risk snapshot is out of date."""
+    rescored = refresh_risk_snapshot()
+    if rescored is None:
+        click.echo('No model is loaded; the snapshot was not refreshed.')
+    else:
+        click.echo(f'Rescored {rescored} students.')
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# HELPER: Training data from real results
+# One row per student per session, in the training_data column layout: the
+# features the analyzer would have built from the student's results up to
+# and including that session, labelled with the rule the synthetic data
+# uses. Attendance and study hours are not recorded, so the analyzer's
+# defaults stand in for them.
+# ══════════════════════════════════════════════════════════════════════════════
+EXPORT_YIELD_PER = 5000   # result rows fetched from the cursor at a time
+
+
+def _training_export_rows():
+    """Yield (matric, department, level, semester, [result dicts]) at the end
+    of each student's session, in one pass over a result stream ordered by
+    student, session and id; only one student's results are held at a time."""
+    first_summary = _first_session_summary()
+    stmt = db.select(Result.student_id, Student.matric_number, Department.name, Result.session,
+                     Course.semester, Course.level, Result.score, Result.grade, SessionSummary.gpa)\
+        .join(Student, Student.id == Result.student_id)\
+        .join(Course, Course.id == Result.course_id)\
+        .outerjoin(Department, Department.id == Student.department_id)\
+        .outerjoin(first_summary, db.and_(first_summary.c.student_id == Result.student_id,
+                                          first_summary.c.session    == Result.session))\
+        .outerjoin(SessionSummary, SessionSummary.id == first_summary.c.summary_id)\
+        .order_by(Result.student_id, Result.session, Result.id)\
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+
+    current, history, level, semester = None, [], 0, ''
+    for sid, matric, department, session, sem, course_level, score, grade, gpa in db.session.execute(stmt):
+        if current is not None and (sid, session) != current[:2]:
+            yield current[2], current[3], level, semester, history
+            if sid != current[0]:
+                history = []
+            level = 0
+        current  = (sid, session, matric, department or '')
+        level    = max(level, course_level or 0)
+        semester = sem
+        history.append({'score': score, 'grade': grade, 'gpa': gpa if gpa is not None else 0})
+    if current is not None:
+        yield current[2], current[3], level, semester, history
+
+
+def training_export_chunks(chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield the exported rows as training_data chunks (dicts of column arrays)."""
+    meta = {c: [] for c in ('student_id', 'department', 'level', 'semester')}
+    features = np.empty((chunk_rows, len(FEATURE_COLS)), dtype=np.float64)
+    n = 0
+
+    def chunk():
+        X     = features[:n]
+        cols  = {col: X[:, i].copy() for i, col in enumerate(FEATURE_COLS)}
+        cols.update({k: np.array(v) for k, v in meta.items()})
+        cols['performance_label'] = performance_labels(
+            cols['avg_score'], cols['failed_courses'], cols['gpa'], cols['score_trend'])
+        return {c: cols[c] for c in TRAINING_COLUMNS}
+
+    for matric, department, level, semester, history in _training_export_rows():
+        PerformanceAnalyzer._feature_row(history, out=features[n])
+        for key, value in zip(meta, (matric, department, level, semester)):
+            meta[key].append(value)
+        n += 1
+        if n == chunk_rows:
+            yield chunk()
+            n = 0
+            for values in meta.values():
+                values.clear()
+    if n:
+        yield chunk()
+
+
+def export_training_data(path, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream the database's results into a training file; {'rows', 'distribution'}."""
+    dtypes = {c: np.float32 for c in TRAINING_COLUMNS}
+    dtypes.update({
+        'student_id':        f'U{Student.matric_number.type.length}',
+        'department':        f'U{Department.name.type.length}',
+        'semester':          f'U{Course.semester.type.length}',
+        'performance_label': f'U{max(len(label) for label in TRAINING_LABELS)}',
+        'level':             np.int16,
+        'num_courses':       np.int32,
+        'failed_courses':    np.int32,
+    })
+    return write_chunks(path, training_export_chunks(chunk_rows), fmt, dtypes)
+
+
+@app.cli.command('export-training')
+@click.option('--out', default=None, help='Output path (default: the training CSV in ml_data).')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'npy']), default='csv')
+@click.option('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, show_default=True,
+              help='Rows computed and written at a time.')
+def export_training_command(out, fmt, chunk_rows):
+    """Write a training file from the results in the database."""
+    out   = out or os.path.join(ML_DIR_WRITABLE, f'student_training_data.{fmt}')
+    start = time.perf_counter()
+    summary = export_training_data(out, fmt, chunk_rows)
+    elapsed = time.perf_counter() - start
+    click.echo(f"Exported {summary['rows']:,} student-session rows to {out} in {elapsed:.1f}s.")
+    for label, count in summary['distribution'].items():
+        click.echo(f'  {label:<10} {count:>10,}')
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -625,6 +1673,9 @@ def admin_dashboard():
     )
 
 
+STUDENT_LIST_LIMIT = 100
+
+
 @app.route('/admin/students', methods=['GET', 'POST'])
 @login_required
 def manage_students():
@@ -654,9 +1705,12 @@ def manage_students():
         flash('Student added successfully', 'success')
         return redirect(url_for('manage_students'))
 
+    q = request.args.get('q', '').strip()
     return render_template('manage_students.html',
-        students    = Student.query.all(),
-        departments = Department.query.all(),
+        students      = search_students(q, STUDENT_LIST_LIMIT),
+        departments   = Department.query.all(),
+        search_q      = q,
+        list_limit    = STUDENT_LIST_LIMIT,
     )
 
 
@@ -696,16 +1750,12 @@ def delete_student(student_id):
     student = Student.query.get_or_404(student_id)
     name    = f'{student.first_name} {student.last_name}'
 
-    Result.query.filter_by(student_id=student.id).delete()
-    SessionSummary.query.filter_by(student_id=student.id).delete()
-
-    user = User.query.get(student.user_id)
-    db.session.delete(student)
-    if user:
-        db.session.delete(user)
+    counts = cascade_delete(student_ids=[student.id])
     db.session.commit()
+    prediction_cache.invalidate(student_id)
 
-    flash(f'Student "{name}" and all their records have been removed.', 'success')
+    flash(f'Student "{name}" and all their records have been removed '
+          f'({_describe_counts(counts)}).', 'success')
     return redirect(url_for('manage_students'))
 
 
@@ -741,6 +1791,7 @@ def edit_course(course_id):
         return redirect(url_for('index'))
 
     course = Course.query.get_or_404(course_id)
+    grading_before = (course.credit_unit, course.semester)
     course.course_code  = request.form.get('course_code',  course.course_code)
     course.course_title = request.form.get('course_title', course.course_title)
     course.credit_unit  = request.form.get('credit_unit',  course.credit_unit)
@@ -749,10 +1800,87 @@ def edit_course(course_id):
     course.department_id= request.form.get('department_id',course.department_id)
 
     db.session.commit()
+    if (course.credit_unit, course.semester) != grading_before:
+        # Units/semester feed every GPA this course contributes to
+        affected = [sid for (sid,) in db.session.query(Result.student_id)
+                    .filter_by(course_id=course.id).distinct()]
+        rebuild_student_summaries(affected, verify=False, commit=False)
+        refresh_student_features(affected)
+        db.session.commit()
+        prediction_cache.invalidate(*affected)
     flash(f'Course "{course.course_title}" updated successfully.', 'success')
     return redirect(url_for('manage_courses'))
 
 
+RESULTS_PAGE_SIZE = 50
+RESULTS_PAGE_MAX  = 200
+
+
+def _encode_results_cursor(result):
+    created_at = result.created_at.isoformat() if result.created_at else ''
+    raw = f'{created_at}|{result.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_results_cursor(cursor):
+    """Inverse of _encode_results_cursor; raises ValueError on a bad cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, result_id = raw.rsplit('|', 1)
+        return (datetime.datetime.fromisoformat(created_at) if created_at else None,
+                int(result_id))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def _results_page(student_id=None, course_id=None, session=None, cursor=None,
+                  limit=RESULTS_PAGE_SIZE):
+    """One page of (Result, Student, Course) rows, newest first.
+
+    Keyset pagination on (created_at, id): the cursor is the last row of the
+    previous page, so every page is an index range scan no matter how deep.
+    Rows without a created_at (written before the column had a default)
+    come last, by id. Returns (rows, next_cursor); next_cursor is None on
+    the last page.
+    """
+    query = db.session.query(Result, Student, Course)\
+        .join(Student, Result.student_id == Student.id)\
+        .join(Course,  Result.course_id  == Course.id)\
+        .options(db.joinedload(Result.lecturer))
+
+    if student_id:
+        query = query.filter(Result.student_id == student_id)
+    if course_id:
+        query = query.filter(Result.course_id == course_id)
+    if session:
+        query = query.filter(Result.session == session)
+    undated = query.filter(Result.created_at.is_(None))
+    if cursor:
+        created_at, result_id = _decode_results_cursor(cursor)
+        if created_at is None:
+            query = undated.filter(Result.id < result_id)
+        else:
+            query = query.filter(db.or_(
+                Result.created_at < created_at,
+                db.and_(Result.created_at == created_at, Result.id < result_id)))
+
+    rows = query.order_by(Result.created_at.desc().nulls_last(), Result.id.desc())\
+        .limit(limit + 1).all()
+    if cursor and created_at is not None and len(rows) <= limit:
+        # The range above stops at the dated rows; the undated ones follow them
+        rows += undated.order_by(Result.id.desc()).limit(limit + 1 - len(rows)).all()
+    next_cursor = _encode_results_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _pending_delete_ids(result_ids):
+    if not result_ids:
+        return set()
+    return {rid for (rid,) in db.session.query(DeleteNotification.result_id).filter(
+        DeleteNotification.status == 'pending',
+        DeleteNotification.result_id.in_(result_ids))}
+
+
 @app.route('/admin/results')
 @login_required
 def manage_results():
@@ -764,40 +1892,73 @@ def manage_results():
     student_id = request.args.get('student_id', type=int)
     course_id  = request.args.get('course_id',  type=int)
     session_f  = request.args.get('session',    '').strip()
+    cursor     = request.args.get('cursor',     '').strip() or None
 
-    query = db.session.query(Result, Student, Course)\
-        .join(Student, Result.student_id == Student.id)\
-        .join(Course,  Result.course_id  == Course.id)
-
-    if student_id:
-        query = query.filter(Result.student_id == student_id)
-    if course_id:
-        query = query.filter(Result.course_id == course_id)
-    if session_f:
-        query = query.filter(Result.session == session_f)
-
-    rows     = query.order_by(Result.created_at.desc()).all()
-    students = Student.query.order_by(Student.last_name).all()
-    courses  = Course.query.order_by(Course.course_code).all()
+    try:
+        rows, next_cursor = _results_page(student_id, course_id, session_f, cursor)
+    except ValueError:
+        rows, next_cursor = _results_page(student_id, course_id, session_f)
+    filter_student_obj = Student.query.get(student_id) if student_id else None
+    filter_course_obj  = Course.query.get(course_id)   if course_id  else None
     sessions = db.session.query(Result.session).distinct().order_by(Result.session.desc()).all()
     sessions = [s[0] for s in sessions]
 
-    # Build a set of result IDs that already have a pending delete request
-    pending_result_ids = {
-        n.result_id for n in DeleteNotification.query.filter_by(status='pending').all()
-    }
+    # Result IDs on this page that already have a pending delete request
+    pending_result_ids = _pending_delete_ids([r.id for r, _, _ in rows])
 
     # Count unresolved notifications for the badge
     pending_notifications_count = DeleteNotification.query.filter_by(status='pending').count()
 
     return render_template('manage_results.html',
-        rows=rows, students=students, courses=courses, sessions=sessions,
+        rows=rows, sessions=sessions,
         filter_student=student_id, filter_course=course_id, filter_session=session_f,
+        filter_student_label=_student_label(filter_student_obj) if filter_student_obj else '',
+        filter_course_label=_course_label(filter_course_obj) if filter_course_obj else '',
+        next_cursor=next_cursor, is_first_page=not cursor,
         pending_result_ids=pending_result_ids,
         pending_notifications_count=pending_notifications_count,
     )
 
 
+@app.route('/api/admin/results')
+@login_required
+def api_results_page():
+    """JSON page of results for the Manage Results table's "Load more"."""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    limit = max(1, min(RESULTS_PAGE_MAX,
+                       request.args.get('limit', RESULTS_PAGE_SIZE, type=int)))
+    try:
+        rows, next_cursor = _results_page(
+            request.args.get('student_id', type=int),
+            request.args.get('course_id',  type=int),
+            request.args.get('session', '').strip(),
+            request.args.get('cursor',  '').strip() or None,
+            limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    pending = _pending_delete_ids([r.id for r, _, _ in rows])
+    return jsonify({
+        'rows': [{
+            'id':           r.id,
+            'student_name': f'{s.first_name} {s.last_name}',
+            'matric':       s.matric_number,
+            'course_code':  c.course_code,
+            'course_title': c.course_title,
+            'session':      r.session,
+            'score':        r.score,
+            'grade':        r.grade,
+            'remarks':      r.remarks,
+            'lecturer':     (r.lecturer.full_name or r.lecturer.username) if r.lecturer else None,
+            'created_at':   r.created_at.strftime('%Y-%m-%d %H:%M') if r.created_at else '—',
+            'pending':      r.id in pending,
+        } for r, s, c in rows],
+        'next_cursor': next_cursor,
+    })
+
+
 @app.route('/admin/results/request-delete/<int:result_id>', methods=['POST'])
 @login_required
 def request_delete_result(result_id):
@@ -836,13 +1997,13 @@ def request_delete_result(result_id):
               'The result will be deleted once they approve.', 'info')
     else:
         # No lecturer owner — admin can delete directly
-        student_id = result.student_id
-        course     = Course.query.get(result.course_id)
-        session    = result.session
+        course = Course.query.get(result.course_id)
         db.session.delete(result)
-        db.session.commit()
         if course:
-            update_student_summary(student_id, session, course.semester)
+            apply_result_change(result.student_id, result.session, course.semester,
+                                course.credit_unit, old_point=result.grade_point)
+        db.session.commit()
+        prediction_cache.invalidate(result.student_id)
         flash('Result deleted and GPA recalculated successfully.', 'success')
 
     return redirect(request.referrer or url_for('manage_results'))
@@ -911,14 +2072,15 @@ def respond_delete_request(notif_id):
         # Perform the actual deletion now
         result = Result.query.get(notif.result_id)
         if result:
-            student_id = result.student_id
-            course     = Course.query.get(result.course_id)
-            session    = result.session
+            course = Course.query.get(result.course_id)
             db.session.delete(result)
-            db.session.commit()
             if course:
-                update_student_summary(student_id, session, course.semester)
+                apply_result_change(result.student_id, result.session, course.semester,
+                                    course.credit_unit, old_point=result.grade_point,
+                                    commit=False)
         db.session.commit()
+        if result:
+            prediction_cache.invalidate(result.student_id)
         flash('You approved the deletion. The result has been removed and GPA recalculated.', 'success')
     else:
         notif.status = 'rejected'
@@ -937,12 +2099,15 @@ def delete_course(course_id):
 
     course = Course.query.get_or_404(course_id)
     title  = course.course_title
+    affected = [sid for (sid,) in db.session.query(Result.student_id)
+                .filter_by(course_id=course.id).distinct()]
 
-    Result.query.filter_by(course_id=course.id).delete()
-    db.session.delete(course)
+    counts = cascade_delete(course_ids=[course.id])
     db.session.commit()
+    prediction_cache.invalidate(*affected)
 
-    flash(f'Course "{title}" and all associated results have been removed.', 'success')
+    flash(f'Course "{title}" and all associated results have been removed '
+          f'({_describe_counts(counts)}).', 'success')
     return redirect(url_for('manage_courses'))
 
 
@@ -972,15 +2137,32 @@ def manage_departments():
         flash(f'Department "{name}" ({code}) added successfully.', 'success')
         return redirect(url_for('manage_departments'))
 
-    departments = Department.query.order_by(Department.created_at.desc()).all()
-    dept_info = []
-    for dept in departments:
-        dept_info.append({
-            'dept':           dept,
-            'student_count':  Student.query.filter_by(department_id=dept.id).count(),
-            'course_count':   Course.query.filter_by(department_id=dept.id).count(),
-            'lecturer_count': User.query.filter_by(role='lecturer', department_id=dept.id).count(),
-        })
+    # One statement: each count is a grouped subquery outer-joined to departments
+    def _counts(query, dept_col, id_col):
+        return query.with_entities(dept_col.label('department_id'),
+                                   db.func.count(id_col).label('n'))\
+                    .group_by(dept_col).subquery()
+
+    students  = _counts(Student.query, Student.department_id, Student.id)
+    courses   = _counts(Course.query,  Course.department_id,  Course.id)
+    lecturers = _counts(User.query.filter(User.role == 'lecturer'), User.department_id, User.id)
+
+    rows = db.session.query(
+        Department,
+        db.func.coalesce(students.c.n,  0),
+        db.func.coalesce(courses.c.n,   0),
+        db.func.coalesce(lecturers.c.n, 0),
+    ).outerjoin(students,  students.c.department_id  == Department.id)\
+     .outerjoin(courses,   courses.c.department_id   == Department.id)\
+     .outerjoin(lecturers, lecturers.c.department_id == Department.id)\
+     .order_by(Department.created_at.desc()).all()
+
+    dept_info = [{
+        'dept':           dept,
+        'student_count':  student_count,
+        'course_count':   course_count,
+        'lecturer_count': lecturer_count,
+    } for dept, student_count, course_count, lecturer_count in rows]
     return render_template('manage_departments.html', dept_info=dept_info)
 
 
@@ -994,26 +2176,17 @@ def delete_department(dept_id):
     dept = Department.query.get_or_404(dept_id)
     name = dept.name
 
-    students = Student.query.filter_by(department_id=dept.id).all()
-    for student in students:
-        Result.query.filter_by(student_id=student.id).delete()
-        SessionSummary.query.filter_by(student_id=student.id).delete()
-        user = User.query.get(student.user_id)
-        db.session.delete(student)
-        if user:
-            db.session.delete(user)
-
-    courses = Course.query.filter_by(department_id=dept.id).all()
-    for course in courses:
-        Result.query.filter_by(course_id=course.id).delete()
-        db.session.delete(course)
+    counts = cascade_delete(
+        student_ids=db.select(Student.id).where(Student.department_id == dept.id),
+        course_ids=db.select(Course.id).where(Course.department_id == dept.id))
 
     User.query.filter_by(role='lecturer', department_id=dept.id).update(
-        {'department_id': None})
-
-    db.session.delete(dept)
+        {'department_id': None}, synchronize_session=False)
+    Department.query.filter_by(id=dept.id).delete(synchronize_session=False)
     db.session.commit()
-    flash(f'Department "{name}" and all its students, courses, and results have been deleted.', 'success')
+    prediction_cache.clear()
+    flash(f'Department "{name}" and all its students, courses, and results have been deleted '
+          f'({_describe_counts(counts)}).', 'success')
     return redirect(url_for('manage_departments'))
 
 
@@ -1080,28 +2253,41 @@ def analytics():
         flash('Access denied', 'error')
         return redirect(url_for('index'))
 
-    students             = Student.query.all()
-    all_students_results = {}
-    for student in students:
-        results = Result.query.filter_by(student_id=student.id).all()
-        if results:
-            all_students_results[student.id] = [{
-                'score': r.score,
-                'grade': r.grade,
-                'gpa':   (SessionSummary.query.filter_by(
-                              student_id=student.id, session=r.session).first()
-                          or type('_', (), {'gpa': 0})()).gpa,
-            } for r in results]
-
-    at_risk_ids      = ai_analyzer.identify_at_risk_students(all_students_results)
-    at_risk_students = Student.query.filter(Student.id.in_(at_risk_ids)).all()
+    # Read the snapshot the risk-snapshot thread keeps current; only an
+    # empty one (first visit after an upgrade) is scored here, and not while
+    # the server is still loading the model (the thread scores it then)
+    unscored = RiskSnapshot.query.first() is None and StudentFeatures.query.first() is not None
+    if unscored and model_state() == 'not loaded':
+        get_analyzer()
+    if unscored and model_state() == 'ready':
+        refresh_risk_snapshot()
+        unscored = False
+    at_risk_students = Student.query.options(db.joinedload(Student.department))\
+        .join(RiskSnapshot, RiskSnapshot.student_id == Student.id)\
+        .filter(RiskSnapshot.label == 'At-Risk').all()
     return render_template('analytics.html',
         at_risk_students = at_risk_students,
-        total_students   = len(students),
+        total_students   = Student.query.count(),
         total_at_risk    = len(at_risk_students),
+        snapshot         = risk_snapshot_status(),
+        unscored         = unscored,
     )
 
 
+@app.route('/admin/analytics/refresh', methods=['POST'])
+@login_required
+def refresh_analytics():
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+    rescored = refresh_risk_snapshot()
+    if rescored is None:
+        flash('The AI model is not loaded, so the snapshot could not be refreshed.', 'error')
+    else:
+        flash(f'At-risk snapshot refreshed ({rescored} students rescored).', 'success')
+    return redirect(url_for('analytics'))
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # ROUTES — LECTURER
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1136,11 +2322,15 @@ def enter_results():
             flash('Invalid score. Must be between 0 and 100', 'error')
             return redirect(url_for('enter_results'))
 
-        course      = Course.query.get(course_id)
+        course      = Course.query.get(course_id) if course_id else None
+        if not course or not student_id or not Student.query.get(student_id):
+            flash('Pick a student and a course from the search suggestions.', 'error')
+            return redirect(url_for('enter_results'))
         result_data = process_result(score, course.credit_unit)
 
         existing = Result.query.filter_by(
             student_id=student_id, course_id=course_id, session=sess).first()
+        old_point = existing.grade_point if existing else None
         if existing:
             existing.score       = score
             existing.grade       = result_data['grade']
@@ -1155,15 +2345,181 @@ def enter_results():
                 grade_point=result_data['grade_point'], remarks=result_data['remarks'],
                 entered_by=current_user.id,            # record ownership
             ))
-        db.session.commit()
-        update_student_summary(student_id, sess, course.semester)
+        apply_result_change(int(student_id), sess, course.semester, course.credit_unit,
+                            old_point=old_point, new_point=result_data['grade_point'])
+        prediction_cache.invalidate(student_id)
         flash('Result entered successfully', 'success')
         return redirect(url_for('enter_results'))
 
-    return render_template('enter_results.html',
-        students = Student.query.all(),
-        courses  = Course.query.all(),
-    )
+    return render_template('enter_results.html')
+
+
+UPLOAD_MATRIC_HEADERS = {'matric_number', 'matric', 'matric_no'}
+UPLOAD_CHUNK_SIZE     = 500   # keeps IN (...) lists under SQLite's variable limit
+
+
+def _iter_upload_rows(upload):
+    """Yield (row_number, matric_number, raw_score) from an uploaded CSV/XLSX.
+
+    The first row must be a header naming a matric number column and a
+    score column. Rows are streamed; the sheet is never loaded whole.
+    """
+    filename = (upload.filename or '').lower()
+    if filename.endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError('Excel uploads need the openpyxl package; upload a CSV instead.')
+        workbook = load_workbook(upload.stream, read_only=True, data_only=True)
+        rows     = workbook.active.iter_rows(values_only=True)
+    elif filename.endswith('.csv'):
+        rows = csv.reader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline=''))
+    else:
+        raise ValueError('Unsupported file type. Upload a .csv or .xlsx file.')
+
+    header = next(rows, None)
+    names  = [str(h or '').strip().lower().replace(' ', '_') for h in (header or [])]
+    try:
+        matric_col = next(i for i, n in enumerate(names) if n in UPLOAD_MATRIC_HEADERS)
+        score_col  = names.index('score')
+    except (StopIteration, ValueError):
+        raise ValueError('The first row must contain "matric_number" and "score" headers.')
+
+    for row_number, row in enumerate(rows, start=2):
+        if not row or all(cell in (None, '') for cell in row):
+            continue
+        matric = row[matric_col] if matric_col < len(row) else None
+        score  = row[score_col]  if score_col  < len(row) else None
+        yield row_number, str(matric or '').strip(), score
+
+
+def check_upload_rows(rows):
+    """Validate an upload's rows before anything is written.
+
+    rows: iterable of (row_number, matric_number, raw_score). Every row is
+    checked with validate_score and its matric number looked up. Returns
+    ({student_id: score}, errors) with a per-row error list; a file that
+    cannot be read raises ValueError while its rows are iterated.
+    """
+    errors  = []
+    pending = {}   # matric -> (row_number, score)
+    for row_number, matric, raw_score in rows:
+        if not matric:
+            errors.append({'row': row_number, 'matric': '', 'error': 'Missing matric number'})
+        elif not validate_score(raw_score):
+            errors.append({'row': row_number, 'matric': matric,
+                           'error': f'Invalid score "{raw_score}". Must be between 0 and 100'})
+        elif matric in pending:
+            errors.append({'row': row_number, 'matric': matric,
+                           'error': f'Duplicate of row {pending[matric][0]}'})
+        else:
+            pending[matric] = (row_number, float(raw_score))
+
+    matrics  = list(pending)
+    students = {}
+    for i in range(0, len(matrics), UPLOAD_CHUNK_SIZE):
+        chunk = matrics[i:i + UPLOAD_CHUNK_SIZE]
+        students.update(db.session.query(Student.matric_number, Student.id)
+                        .filter(Student.matric_number.in_(chunk)).all())
+    for matric in matrics:
+        if matric not in students:
+            errors.append({'row': pending.pop(matric)[0], 'matric': matric,
+                           'error': 'No student with this matric number'})
+
+    errors.sort(key=lambda e: e['row'])
+    return {students[m]: score for m, (_, score) in pending.items()}, errors
+
+
+def bulk_upsert_results(course, session, scores, entered_by):
+    """Grade and upsert checked scores ({student_id: score}, from
+    check_upload_rows) for one course and session in a single transaction.
+
+    Each affected student's summary is updated once and their feature rows
+    are refreshed together at the end. Returns {'created', 'updated'}.
+    """
+    student_ids = list(scores)
+    existing    = {}
+    for i in range(0, len(student_ids), UPLOAD_CHUNK_SIZE):
+        chunk = student_ids[i:i + UPLOAD_CHUNK_SIZE]
+        existing.update((r.student_id, r) for r in Result.query.filter(
+            Result.course_id == course.id, Result.session == session,
+            Result.student_id.in_(chunk)))
+
+    created = updated = 0
+    now     = datetime.datetime.utcnow()
+    try:
+        for student_id, score in scores.items():
+            result_data = process_result(score, course.credit_unit)
+            result      = existing.get(student_id)
+            old_point   = result.grade_point if result else None
+            if result:
+                result.score       = score
+                result.grade       = result_data['grade']
+                result.grade_point = result_data['grade_point']
+                result.remarks     = result_data['remarks']
+                result.entered_by  = entered_by
+                result.updated_at  = now
+                updated += 1
+            else:
+                db.session.add(Result(
+                    student_id=student_id, course_id=course.id, session=session,
+                    score=score, grade=result_data['grade'],
+                    grade_point=result_data['grade_point'], remarks=result_data['remarks'],
+                    entered_by=entered_by,
+                ))
+                created += 1
+            apply_result_change(student_id, session, course.semester, course.credit_unit,
+                                old_point=old_point, new_point=result_data['grade_point'],
+                                commit=False, features=False)
+        refresh_student_features(student_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    prediction_cache.invalidate(*student_ids)
+    return {'created': created, 'updated': updated}
+
+
+@app.route('/lecturer/enter-results/upload', methods=['POST'])
+@login_required
+def upload_results():
+    if current_user.role != 'lecturer':
+        flash('Access denied', 'error')
+        return redirect(url_for('index'))
+
+    course = Course.query.get(request.form.get('course_id', type=int))
+    sess   = request.form.get('session', '').strip()
+    upload = request.files.get('results_file')
+    if not course or not sess or not upload or not upload.filename:
+        flash('Choose a course, a session and a file to upload.', 'error')
+        return redirect(url_for('enter_results'))
+
+    # Only reading and checking the file reports its problems to the user;
+    # a failure while saving is the server's, and is logged instead
+    try:
+        scores, errors = check_upload_rows(_iter_upload_rows(upload))
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('enter_results'))
+    except Exception as e:
+        logger.error(f'upload_results read error: {e}')
+        flash('The file could not be read; no results were saved.', 'error')
+        return redirect(url_for('enter_results'))
+
+    try:
+        report = bulk_upsert_results(course, sess, scores, current_user.id)
+    except Exception as e:
+        logger.error(f'upload_results error: {e}')
+        flash('Upload failed; no results were saved.', 'error')
+        return redirect(url_for('enter_results'))
+    report['errors'] = errors
+
+    saved = report['created'] + report['updated']
+    flash(f'{course.course_code} {sess}: {saved} result(s) saved '
+          f'({report["created"]} new, {report["updated"]} updated), '
+          f'{len(report["errors"])} row(s) rejected.',
+          'success' if not report['errors'] else 'warning')
+    return render_template('enter_results.html', upload_report=report)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1182,27 +2538,15 @@ def student_dashboard():
         flash('Student record not found', 'error')
         return redirect(url_for('index'))
 
-    results     = Result.query.filter_by(student_id=student.id).all()
-    result_data = [{
-        'score': r.score,
-        'grade': r.grade,
-        'gpa':   (SessionSummary.query.filter_by(
-                      student_id=student.id, session=r.session).first()
-                  or type('_', (), {'gpa': 0})()).gpa,
-    } for r in results]
-
-    latest_summary = SessionSummary.query.filter_by(
-        student_id=student.id).order_by(SessionSummary.created_at.desc()).first()
-    cgpa = latest_summary.cgpa if latest_summary else 0.0
+    results           = Result.query.options(db.joinedload(Result.course))\
+        .filter_by(student_id=student.id).order_by(Result.id).all()
+    result_data, cgpa = student_analysis_inputs(student.id)
 
     return render_template('student_dashboard.html',
-        student         = student,
-        results         = results,
-        cgpa            = cgpa,
-        prediction      = ai_analyzer.predict_performance(result_data),
-        trends          = ai_analyzer.analyze_trends(result_data),
-        recommendations = ai_analyzer.generate_recommendations(result_data, cgpa),
-        metrics         = ai_analyzer.calculate_performance_metrics(result_data),
+        student  = student,
+        results  = results,
+        cgpa     = cgpa,
+        analysis = cached_analysis(student.id, result_data, cgpa),
     )
 
 
@@ -1210,19 +2554,115 @@ def student_dashboard():
 # ROUTES — API
 # ══════════════════════════════════════════════════════════════════════════════
 
+SEARCH_LIMIT_DEFAULT = 10
+SEARCH_LIMIT_MAX     = 50
+
+
+def _prefix_filter(column, prefix):
+    """Case-insensitive "column starts with prefix", written as a range on the
+    NOCASE-collated column so SQLite answers it from the matching *_nocase
+    index instead of scanning the table."""
+    col = column.collate('NOCASE')
+    return db.and_(col >= prefix, col < prefix + '\U0010ffff')
+
+
+def _prefix_matches(model, column, prefix, limit):
+    return model.query.filter(_prefix_filter(column, prefix))\
+        .order_by(column.collate('NOCASE')).limit(limit).all()
+
+
+def _merge_matches(groups, key, limit):
+    merged = {}
+    for rows in groups:
+        for row in rows:
+            merged.setdefault(row.id, row)
+    return sorted(merged.values(), key=key)[:limit]
+
+
+def search_students(q, limit=SEARCH_LIMIT_DEFAULT):
+    """Up to limit students whose matric number, first or last name starts with q."""
+    q = (q or '').strip()
+    if not q:
+        return Student.query.order_by(Student.matric_number).limit(limit).all()
+    groups = [_prefix_matches(Student, col, q, limit) for col in
+              (Student.matric_number, Student.first_name, Student.last_name)]
+    first, _, last = q.partition(' ')
+    if last.strip():
+        # "jane sm" → first name "jane…" and last name "sm…"
+        groups.append(Student.query.filter(
+            _prefix_filter(Student.first_name, first),
+            _prefix_filter(Student.last_name, last.strip()),
+        ).limit(limit).all())
+    return _merge_matches(groups, lambda s: s.matric_number, limit)
+
+
+def search_courses(q, limit=SEARCH_LIMIT_DEFAULT):
+    """Up to limit courses whose code or title starts with q."""
+    q = (q or '').strip()
+    if not q:
+        return Course.query.order_by(Course.course_code).limit(limit).all()
+    groups = [_prefix_matches(Course, col, q, limit)
+              for col in (Course.course_code, Course.course_title)]
+    return _merge_matches(groups, lambda c: c.course_code, limit)
+
+
+def _student_label(s):
+    return f'{s.matric_number} - {s.first_name} {s.last_name}'
+
+
+def _course_label(c):
+    return f'{c.course_code} - {c.course_title} ({c.credit_unit} units)'
+
+
+def _search_limit():
+    return max(1, min(SEARCH_LIMIT_MAX,
+                      request.args.get('limit', SEARCH_LIMIT_DEFAULT, type=int)))
+
+
+@app.route('/api/search/students')
+@login_required
+def api_search_students():
+    if current_user.role not in ('admin', 'lecturer'):
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify({'results': [{
+        'id':     s.id,
+        'matric': s.matric_number,
+        'name':   f'{s.first_name} {s.last_name}',
+        'label':  _student_label(s),
+    } for s in search_students(request.args.get('q'), _search_limit())]})
+
+
+@app.route('/api/search/courses')
+@login_required
+def api_search_courses():
+    if current_user.role not in ('admin', 'lecturer'):
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify({'results': [{
+        'id':          c.id,
+        'code':        c.course_code,
+        'title':       c.course_title,
+        'credit_unit': c.credit_unit,
+        'label':       _course_label(c),
+    } for c in search_courses(request.args.get('q'), _search_limit())]})
+
+
 @app.route('/api/student-performance/<int:student_id>')
 @login_required
 def api_student_performance(student_id):
     student     = Student.query.get_or_404(student_id)
-    results     = Result.query.filter_by(student_id=student_id).all()
-    result_data = [{'score': r.score, 'grade': r.grade,
-                    'course': r.course.course_code, 'session': r.session}
-                   for r in results]
+    results     = Result.query.options(db.joinedload(Result.course))\
+        .filter_by(student_id=student_id).order_by(Result.id).all()
+    # Analyse the same result list (with session GPAs) the stored features
+    # were built from, so the metrics and the prediction agree; the inputs
+    # match the student dashboard's, so both share one cache entry
+    result_data, cgpa = student_analysis_inputs(student.id)
     return jsonify({
         'student': {'name': f'{student.first_name} {student.last_name}',
                     'matric': student.matric_number},
-        'metrics': ai_analyzer.calculate_performance_metrics(result_data),
-        'results': result_data,
+        'metrics': cached_analysis(student.id, result_data, cgpa).metrics,
+        'results': [{'score': r.score, 'grade': r.grade,
+                     'course': r.course.course_code, 'session': r.session}
+                    for r in results],
     })
 
 
@@ -1238,26 +2678,32 @@ def ml_status():
     if current_user.role != 'admin':
         return jsonify({'error': 'Access denied'}), 403
 
+    analyzer     = get_analyzer()
     csv_path     = os.path.join(ML_DIR_WRITABLE, 'student_training_data.csv')
-    model_exists = os.path.exists(MODEL_PATH)
+    model_exists = analyzer._ml_ready
     csv_exists   = os.path.exists(csv_path)
     model_mtime  = None
     csv_rows     = None
 
     if model_exists:
-        model_mtime = datetime.datetime.fromtimestamp(
-            os.path.getmtime(MODEL_PATH)).strftime('%Y-%m-%d %H:%M')
+        trained = analyzer.metadata.get('created_at')
+        model_mtime = (datetime.datetime.fromisoformat(trained) if trained else
+                       datetime.datetime.fromtimestamp(os.path.getmtime(
+                           os.path.join(analyzer.model_dir, MODEL_FILES[0])))
+                       ).strftime('%Y-%m-%d %H:%M')
     if csv_exists:
         try:
-            csv_rows = len(pd.read_csv(csv_path))
-        except Exception:
+            csv_rows = training_data_rows(csv_path)
+        except OSError:
             csv_rows = '?'
 
     return jsonify({
         'model_exists':  model_exists,
         'csv_exists':    csv_exists,
         'model_trained': model_mtime,
+        'model_version': analyzer.version,
         'csv_rows':      csv_rows,
+        'prediction_cache': prediction_cache.stats(),
     })
 
 
@@ -1268,156 +2714,347 @@ def ml_generate_data():
         return jsonify({'error': 'Access denied'}), 403
 
     try:
-        n_samples = max(200, min(5000, int(request.form.get('n_samples', 1000))))
-        np.random.seed(42)
-
-        def _g(s):
-            if s>=70: return 'A'
-            elif s>=60: return 'B'
-            elif s>=50: return 'C'
-            elif s>=45: return 'D'
-            elif s>=40: return 'E'
-            else: return 'F'
-
-        def _gp(g): return {'A':5,'B':4,'C':3,'D':2,'E':1,'F':0}.get(g, 0)
-
-        def _calc_gpa(sc, cu):
-            t = sum(cu)
-            return round(sum(_gp(_g(s))*c for s,c in zip(sc,cu))/t, 2) if t else 0.0
-
-        def _label(avg, fails, gpa, trend):
-            if   avg>=68 and fails==0 and gpa>=3.5: return 'Excellent'
-            elif avg>=55 and fails<=1 and gpa>=2.5 and trend>=-3: return 'Good'
-            elif avg>=45 and fails<=2 and gpa>=1.5: return 'Average'
-            else: return 'At-Risk'
-
-        archetypes = [(78,6,.15),(68,7,.25),(57,8,.30),(47,9,.20),(35,10,.10)]
-        records    = []
-        for i in range(n_samples):
-            idx     = np.random.choice(len(archetypes), p=[a[2] for a in archetypes])
-            ms, ss, _ = archetypes[idx]
-            nc      = np.random.randint(4, 8)
-            cu      = np.random.choice([2,3,4], size=nc)
-            sc      = np.clip(np.random.normal(ms, ss, nc), 0, 100).astype(int).tolist()
-            att     = float(np.clip(np.random.normal(75+(ms-55)*.3, 10), 20, 100))
-            sh      = float(np.clip(np.random.normal(2+(ms-40)*.08, 1.5), 0, 12))
-            avg     = round(float(np.mean(sc)), 2)
-            fails   = sum(1 for s in sc if s < 40)
-            gpa     = _calc_gpa(sc, cu.tolist())
-            prev    = round(float(np.clip(avg + np.random.normal(0,5), 0, 100)), 2)
-            trend   = avg - prev
-            records.append({
-                'student_id':           f'STU{1001+i}',
-                'department':           np.random.choice(['Computer Science','Engineering','Business','Medicine','Law','Arts']),
-                'level':                np.random.choice([100,200,300,400]),
-                'semester':             np.random.choice(['First','Second']),
-                'num_courses':          nc,
-                'avg_score':            avg,
-                'prev_avg_score':       prev,
-                'score_trend':          round(trend, 2),
-                'score_std':            round(float(np.std(sc)), 2),
-                'failed_courses':       fails,
-                'gpa':                  gpa,
-                'pass_rate':            round((nc-fails)/nc*100, 2),
-                'attendance_rate':      round(att, 2),
-                'study_hours_per_week': round(sh, 2),
-                'performance_label':    _label(avg, fails, gpa, trend),
-            })
-
-        df = pd.DataFrame(records)
+        n_samples = max(200, min(app.config['ML_GENERATE_MAX_ROWS'],
+                                 int(request.form.get('n_samples', 1000))))
         os.makedirs(ML_DIR_WRITABLE, exist_ok=True)
         csv_out = os.path.join(ML_DIR_WRITABLE, 'student_training_data.csv')
-        df.to_csv(csv_out, index=False)
+        summary = write_training_data(csv_out, n_samples)
 
         return jsonify({
             'success':      True,
             'message':      f'Generated {n_samples} training records successfully.',
             'rows':         n_samples,
-            'distribution': df['performance_label'].value_counts().to_dict(),
+            'distribution': summary['distribution'],
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/admin/ml/train', methods=['POST'])
+@app.route('/admin/ml/export', methods=['POST'])
 @login_required
-def ml_train_model():
+def ml_export_data():
     if current_user.role != 'admin':
         return jsonify({'error': 'Access denied'}), 403
 
     try:
-        csv_path = os.path.join(ML_DIR_WRITABLE, 'student_training_data.csv')
-        if not os.path.exists(csv_path):
+        # Keep the current training file rather than replace it with an empty one
+        if Result.query.first() is None:
             return jsonify({'success': False,
-                            'error': 'Training data not found. Generate data first.'}), 400
-
-        df    = pd.read_csv(csv_path)
-        X     = df[FEATURE_COLS]
-        y     = df['performance_label']
-        le    = LabelEncoder()
-        y_enc = le.fit_transform(y)
-
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y_enc, test_size=0.2, random_state=42, stratify=y_enc)
-
-        scaler    = StandardScaler()
-        X_train_s = scaler.fit_transform(X_train)
-        X_test_s  = scaler.transform(X_test)
-
-        n_estimators = max(50, min(500, int(request.form.get('n_estimators', 200))))
-        rf = RandomForestClassifier(
-            n_estimators=n_estimators, max_depth=12,
-            min_samples_split=4, min_samples_leaf=2,
-            class_weight='balanced', random_state=42, n_jobs=-1)
-        rf.fit(X_train_s, y_train)
-
-        cv_scores = cross_val_score(rf, X_train_s, y_train, cv=5, scoring='accuracy')
-        y_pred    = rf.predict(X_test_s)
-        test_acc  = float(accuracy_score(y_test, y_pred))
-        report    = classification_report(y_test, y_pred,
-                                          target_names=le.classes_, output_dict=True)
-
-        # Save retrained models to writable dir (next to the EXE)
+                            'error': 'There are no results in the database to export.'}), 400
         os.makedirs(ML_DIR_WRITABLE, exist_ok=True)
-        w_model   = os.path.join(ML_DIR_WRITABLE, 'performance_model.pkl')
-        w_scaler  = os.path.join(ML_DIR_WRITABLE, 'scaler.pkl')
-        w_encoder = os.path.join(ML_DIR_WRITABLE, 'label_encoder.pkl')
-        w_feature = os.path.join(ML_DIR_WRITABLE, 'feature_names.pkl')
-        for path, obj in [(w_model, rf), (w_scaler, scaler),
-                          (w_encoder, le), (w_feature, FEATURE_COLS)]:
-            with open(path, 'wb') as f:
-                pickle.dump(obj, f)
-
-        global ai_analyzer
-        ai_analyzer = PerformanceAnalyzer()
-
-        importances = dict(sorted(
-            {f: round(float(v), 4) for f, v in zip(FEATURE_COLS, rf.feature_importances_)}.items(),
-            key=lambda x: x[1], reverse=True))
+        csv_out = os.path.join(ML_DIR_WRITABLE, 'student_training_data.csv')
+        summary = export_training_data(csv_out)
 
         return jsonify({
-            'success':            True,
-            'test_accuracy':      round(test_acc * 100, 2),
-            'cv_accuracy':        round(float(cv_scores.mean()) * 100, 2),
-            'cv_std':             round(float(cv_scores.std()) * 100, 2),
-            'n_estimators':       n_estimators,
-            'training_rows':      len(df),
-            'per_class':          {cls: {
-                                        'precision': round(report[cls]['precision'], 3),
-                                        'recall':    round(report[cls]['recall'], 3),
-                                        'f1':        round(report[cls]['f1-score'], 3),
-                                        'support':   int(report[cls]['support']),
-                                   } for cls in le.classes_},
-            'feature_importance': importances,
+            'success':      True,
+            'message':      f"Exported {summary['rows']} training records from the results.",
+            'rows':         summary['rows'],
+            'distribution': summary['distribution'],
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# ── Background training jobs ───────────────────────────────────────────────
+# Training (one fit + 5 cross-validation fits) runs in a separate process so
+# no request thread, and no desktop window, waits on it. The child is
+# training_worker.py, which imports only ml_engine, so it never re-runs this
+# module; it is an ordinary (non-daemon) process, so joblib can still fit on
+# every core, and it is stopped explicitly on cancel and when the app exits.
+# The child writes its artefacts to a staging directory, which becomes a new
+# registry version and is activated only once the job reports success.
+TRAINING_JOBS_KEPT   = 20
+TRAINING_STOP_GRACE  = 5      # seconds between terminate() and kill()
+
+
+class TrainingJob:
+    def __init__(self, job_id, n_estimators):
+        self.id           = job_id
+        self.n_estimators = n_estimators
+        self.state        = 'running'      # running | succeeded | failed | cancelled
+        self.phase        = 'Starting'
+        self.progress     = 0
+        self.result       = None
+        self.error        = None
+        self.started_at   = datetime.datetime.utcnow()
+        self.finished_at  = None
+        self.process      = None
+
+    def finish(self, state, phase, result=None, error=None):
+        self.state, self.phase       = state, phase
+        self.result, self.error      = result, error
+        self.finished_at             = datetime.datetime.utcnow()
+        if state == 'succeeded':
+            self.progress = 100
+
+    def to_dict(self):
+        return {
+            'job_id':       self.id,
+            'state':        self.state,
+            'phase':        self.phase,
+            'progress':     self.progress,
+            'n_estimators': self.n_estimators,
+            'started_at':   self.started_at.isoformat(),
+            'finished_at':  self.finished_at.isoformat() if self.finished_at else None,
+            'result':       self.result,
+            'error':        self.error,
+        }
+
+
+training_jobs  = OrderedDict()   # job id -> TrainingJob, oldest first
+_training_lock = threading.Lock()
+
+
+def _install_trained_model(staging_dir, summary):
+    """Publish a finished job's artefacts as a new registry version and activate it."""
+    version = publish_version(ML_REGISTRY_DIR, staging_dir,
+                              dict(summary, feature_cols=FEATURE_COLS))
+    activate_model(version)
+    prune_versions(ML_REGISTRY_DIR, MODEL_VERSIONS_KEPT)
+    return version
+
+
+def _training_worker_command(job_args):
+    """argv that starts training_worker with job_args (the frozen EXE runs itself)."""
+    payload = json.dumps(job_args)
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, '--training-worker', payload]
+    return [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         'training_worker.py'), payload]
+
+
+def _read_training_messages(process, messages):
+    """Forward the child's JSON lines to messages until its stdout closes."""
+    for line in process.stdout:
+        try:
+            messages.put(json.loads(line))
+        except ValueError:
+            logger.error(f'Training process wrote an unreadable line: {line.strip()[:200]}')
+
+
+def _stop_training_process(process):
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(TRAINING_STOP_GRACE)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+@atexit.register
+def _stop_training_jobs():
+    """Do not leave a training process running after the app exits."""
+    for job in list(training_jobs.values()):
+        if job.process is not None:
+            _stop_training_process(job.process)
+
+
+def _watch_training_job(job, messages, staging_dir):
+    try:
+        while True:
+            alive = job.process.poll() is None
+            try:
+                kind, *payload = messages.get(timeout=0.5)
+            except queue.Empty:
+                if job.state != 'running':          # cancelled
+                    return
+                if not alive:
+                    with _training_lock:
+                        job.finish('failed', 'Failed', error='Training process exited unexpectedly.')
+                    return
+                continue
+            with _training_lock:
+                if job.state != 'running':
+                    return
+                if kind == 'progress':
+                    job.phase, job.progress = payload
+                elif kind == 'error':
+                    job.finish('failed', 'Failed', error=payload[0])
+                    return
+                elif kind == 'done':
+                    try:
+                        version = _install_trained_model(staging_dir, payload[0])
+                        job.finish('succeeded', 'Complete', result=dict(payload[0], version=version))
+                    except Exception as e:
+                        logger.error(f'Installing trained model failed: {e}')
+                        job.finish('failed', 'Failed', error=f'Could not install the model: {e}')
+                    return
+    finally:
+        _stop_training_process(job.process)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def start_training_job(csv_path, n_estimators):
+    """Start a training process; returns (job, None) or (None, the job already running)."""
+    with _training_lock:
+        running = next((j for j in training_jobs.values() if j.state == 'running'), None)
+        if running:
+            return None, running
+
+        os.makedirs(ML_DIR_WRITABLE, exist_ok=True)
+        staging  = tempfile.mkdtemp(prefix='.training-', dir=ML_DIR_WRITABLE)
+        messages = queue.Queue()
+        job      = TrainingJob(os.urandom(6).hex(), n_estimators)
+        job.process = subprocess.Popen(
+            _training_worker_command({'csv_path': csv_path, 'out_dir': staging,
+                                      'n_estimators': n_estimators,
+                                      'feature_cols': FEATURE_COLS}),
+            stdout=subprocess.PIPE, text=True, encoding='utf-8')
+        threading.Thread(target=_read_training_messages, daemon=True,
+                         args=(job.process, messages)).start()
+        threading.Thread(target=_watch_training_job, daemon=True,
+                         args=(job, messages, staging)).start()
+
+        training_jobs[job.id] = job
+        while len(training_jobs) > TRAINING_JOBS_KEPT:
+            oldest = next(iter(training_jobs.values()))
+            if oldest.state == 'running':
+                break
+            training_jobs.popitem(last=False)
+        return job, None
+
+
+@app.route('/admin/ml/train', methods=['POST'])
+@login_required
+def ml_train_model():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    csv_path = os.path.join(ML_DIR_WRITABLE, 'student_training_data.csv')
+    if not os.path.exists(csv_path):
+        return jsonify({'success': False,
+                        'error': 'Training data not found. Generate data first.'}), 400
+
+    n_estimators = max(50, min(500, int(request.form.get('n_estimators', 200))))
+    try:
+        job, running = start_training_job(csv_path, n_estimators)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    if running:
+        return jsonify({'success': False, 'job_id': running.id,
+                        'error': 'A training job is already running.'}), 409
+    return jsonify({'success': True, 'job_id': job.id,
+                    'status_url': url_for('ml_train_status', job_id=job.id)}), 202
+
+
+@app.route('/admin/ml/train/<job_id>')
+@login_required
+def ml_train_status(job_id):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    job = training_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown training job'}), 404
+    with _training_lock:
+        return jsonify(job.to_dict())
+
+
+@app.route('/admin/ml/train/<job_id>/cancel', methods=['POST'])
+@login_required
+def ml_train_cancel(job_id):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    job = training_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown training job'}), 404
+    with _training_lock:
+        if job.state != 'running':
+            return jsonify({'success': False, 'error': f'Job already {job.state}.'}), 409
+        job.finish('cancelled', 'Cancelled')
+    # outside the lock: the watcher needs it to notice the cancel and stop
+    _stop_training_process(job.process)
+    return jsonify({'success': True, **job.to_dict()})
+
+
+# ── Model registry ─────────────────────────────────────────────────────────
+
+def _model_versions():
+    """Registered versions (oldest first), preceded by the bundled model if shipped."""
+    versions = list_versions(ML_REGISTRY_DIR)
+    if os.path.exists(os.path.join(ML_DIR, MODEL_FILES[0])):
+        versions.insert(0, {'version': BUNDLED, 'created_at': None})
+    return versions
+
+
+@app.route('/admin/ml/models')
+@login_required
+def ml_models():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+    active = get_analyzer().version
+    return jsonify({
+        'active':   active,
+        'versions': [dict(meta, active=meta['version'] == active) for meta in _model_versions()],
+    })
+
+
+@app.route('/admin/ml/models/rollback', methods=['POST'])
+@login_required
+def ml_rollback_model():
+    """Activate the version before the current one, or the one named in 'version'."""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    current = get_analyzer().version
+    names   = [meta['version'] for meta in _model_versions()]
+    target  = request.form.get('version')
+    if not target:
+        older  = names[:names.index(current)] if current in names else []
+        target = older[-1] if older else None
+    if not target:
+        return jsonify({'success': False, 'error': 'There is no earlier model to roll back to.'}), 409
+    if target not in names:
+        return jsonify({'success': False, 'error': f'Unknown model version {target}.'}), 404
+
+    try:
+        activate_model(target)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True, 'active': target, 'previous': current})
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # ENTRY POINT
+# Importing this module only defines things. The serving process prepares the
+# database and starts its background threads in init_server(); CLI commands,
+# scripts and tests import the module without either.
 # ══════════════════════════════════════════════════════════════════════════════
 
+def init_app_data():
+    """Create or upgrade the schema, seed a brand-new database and backfill
+    the derived per-student tables. Safe to run on every start."""
+    with app.app_context():
+        _seed_defaults()
+        _backfill_student_features()
+
+
+def start_background_workers():
+    """Preload the model and keep the at-risk snapshot current (serving process only)."""
+    threading.Thread(target=_load_initial_analyzer, name='model-loader', daemon=True).start()
+    if app.config['RISK_SNAPSHOT_INTERVAL']:
+        threading.Thread(target=_risk_snapshot_worker, name='risk-snapshot', daemon=True,
+                         args=(app.config['RISK_SNAPSHOT_INTERVAL'],
+                               app.config['RISK_SNAPSHOT_DEBOUNCE'])).start()
+
+
+def init_server():
+    """Everything a serving process does before it takes requests.
+
+    python app.py calls it, and so does wsgi.py for WSGI servers and
+    flask --app wsgi run. Call it once per serving process.
+    """
+    init_app_data()
+    start_background_workers()
+
+
+@app.cli.command('init-data')
+def init_data_command():
+    """Create or upgrade the database and seed it if it is new."""
+    init_app_data()
+    click.echo('Database is ready.')
+
+
 def find_free_port(start=5000, end=65535):
     """Find the first available TCP port in the given range."""
     import socket
@@ -1431,12 +3068,56 @@ def find_free_port(start=5000, end=65535):
     raise RuntimeError('No free port found in range.')
 
 
+def wait_until_serving(url, timeout=30.0):
+    """Poll url until the server answers; seconds from _STARTED to its first byte, or None."""
+    import urllib.error
+    import urllib.request
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                resp.read(1)
+            return time.perf_counter() - _STARTED
+        except urllib.error.HTTPError:
+            return time.perf_counter() - _STARTED   # an error page is still a response
+        except OSError:
+            time.sleep(0.01)
+    return None
+
+
+def measure_startup(port):
+    """Start the server, fetch the login page once and report how long that took.
+
+    Times are measured from the first line of app.py, so they leave out
+    interpreter start-up and, in the one-file EXE, unpacking the bundle.
+    """
+    imported = time.perf_counter() - _STARTED
+    init_server()
+    threading.Thread(target=lambda: app.run(host='127.0.0.1', port=port, debug=False,
+                                            use_reloader=False), daemon=True).start()
+    first_byte = wait_until_serving(f'http://127.0.0.1:{port}/login')
+    if first_byte is None:
+        print('[STARTUP] server did not answer within 30 s')
+        return 1
+    get_analyzer()
+    print(f'[STARTUP] app module loaded     {imported * 1e3:8.0f} ms')
+    print(f'[STARTUP] first byte of /login  {first_byte * 1e3:8.0f} ms')
+    print(f'[STARTUP] model loaded          {model_loaded_at * 1e3:8.0f} ms')
+    return 0
+
+
 if __name__ == '__main__':
-    import time
-    import threading
+    multiprocessing.freeze_support()   # joblib workers re-launch the frozen EXE
+    if '--training-worker' in sys.argv:
+        # The frozen EXE started as a training job's child (see start_training_job)
+        from training_worker import main as training_worker_main
+        sys.exit(training_worker_main())
 
     port = find_free_port()
     url  = f'http://127.0.0.1:{port}'
+    if '--measure-startup' in sys.argv:
+        sys.exit(measure_startup(port))
+    init_app_data()
     print(f'[INFO] Starting server on {url}')
 
     # ── Try to open a native desktop window via pywebview ──────────────────
@@ -1446,13 +3127,14 @@ if __name__ == '__main__':
         def _run_flask():
             app.run(host='127.0.0.1', port=port, debug=False, use_reloader=False)
 
+        start_background_workers()
         flask_thread = threading.Thread(target=_run_flask, daemon=True)
         flask_thread.start()
 
-        # Give Flask a moment to start before pywebview tries to load the URL.
-        # This is especially important inside a PyInstaller onefile EXE where
-        # startup is slightly slower than in normal development.
-        time.sleep(1.5)
+        # Wait for Flask to answer before pywebview tries to load the URL,
+        # rather than sleeping for a fixed time that is too short in a slow
+        # PyInstaller onefile start and too long everywhere else.
+        wait_until_serving(url)
 
         webview.create_window(
             'Student Result Management System — Adeleke University',
@@ -1467,7 +3149,11 @@ if __name__ == '__main__':
         # pywebview not installed — fall back to regular browser launch
         import webbrowser
         def _open_browser():
-            time.sleep(1)
+            wait_until_serving(url)
             webbrowser.open(url)
         threading.Thread(target=_open_browser, daemon=True).start()
+        # The debug reloader re-runs this script in a child that does the
+        # serving; only that process gets the background threads
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            start_background_workers()
         app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
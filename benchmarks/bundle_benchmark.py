@@ -0,0 +1,139 @@
+"""
+Model Bundle Benchmark
+Compares loading the four pickles (which imports sklearn) with opening the
+memory-mapped model bundle, each in a fresh interpreter, checks that both
+score the training data identically, and measures how much of the bundle
+N worker processes share instead of each holding a private copy.
+
+Run:  python benchmarks/bundle_benchmark.py [--runs 5] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+from ml_engine import BUNDLE_FILE, MODEL_FILES, FlatForest   # noqa: E402
+
+ML_DIR       = os.path.join(ROOT, 'ml_data')
+TRAINING_CSV = os.path.join(ML_DIR, 'student_training_data.csv')
+
+LOAD_PICKLES = f'''
+import os, pickle
+for name in {list(MODEL_FILES)!r}:
+    with open(os.path.join({ML_DIR!r}, name), 'rb') as f:
+        pickle.load(f)
+'''
+LOAD_BUNDLE = f'''
+import os, sys
+sys.path.insert(0, {ROOT!r})
+from ml_engine import FlatForest
+FlatForest.load(os.path.join({ML_DIR!r}, {BUNDLE_FILE!r}))
+'''
+# Touch every page of the bundle, as scoring eventually does, then report
+# this process's private and shared resident memory in KB
+WORKER = LOAD_BUNDLE.replace('FlatForest.load', 'forest = FlatForest.load') + '''
+import json, numpy as np
+forest.predict_proba(np.zeros((1, len(forest.feature_cols))))
+for name in ('feature', 'threshold', 'left', 'right', 'value'):
+    int(getattr(forest, name).sum())
+mem = {}
+with open('/proc/self/smaps_rollup') as f:
+    for line in f:
+        key, _, rest = line.partition(':')
+        if key in ('Private_Clean', 'Private_Dirty', 'Shared_Clean', 'Shared_Dirty'):
+            mem[key] = int(rest.split()[0])
+print(json.dumps(mem), flush=True)
+sys.stdin.read()
+'''
+
+
+def load_time(code, runs):
+    """Best wall time of `python -c code` minus that of an empty interpreter."""
+    def best(src):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-W', 'ignore', '-c', src], check=True)
+            times.append(time.perf_counter() - start)
+        return min(times)
+    return best(code) - best('pass')
+
+
+def check_parity():
+    import pickle
+    models = []
+    for name in MODEL_FILES[:3]:
+        with open(os.path.join(ML_DIR, name), 'rb') as f:
+            models.append(pickle.load(f))
+    model, scaler, encoder = models
+    forest = FlatForest.load(os.path.join(ML_DIR, BUNDLE_FILE))
+    X = pd.read_csv(TRAINING_CSV)[forest.feature_cols].to_numpy(dtype=np.float64)
+
+    assert np.array_equal(scaler.transform(X), forest.transform(X)), 'scaling differs'
+    assert forest.matches(model), 'bundle was not exported from performance_model.pkl'
+    assert list(forest.labels) == list(encoder.classes_), 'labels differ'
+    S = forest.transform(X)
+    sk, flat = model.predict_proba(S), forest.predict_proba(S)
+    if np.allclose(sk, flat):
+        print(f'Parity OK: {len(X):,} training rows score the same from pickles and bundle.')
+    else:
+        # A newer sklearn than the one that pickled the model takes the
+        # trees' stored class counts for fractions; normalise each tree's
+        # output the way the pickling sklearn did and compare with that
+        sk = np.zeros_like(flat)
+        for est in model.estimators_:
+            counts = est.tree_.predict(S.astype(np.float32))[:, :flat.shape[1]]
+            sk    += counts / counts.sum(axis=1, keepdims=True)
+        assert np.allclose(sk / len(model.estimators_), flat), 'probabilities differ'
+        print(f'Parity OK: {len(X):,} training rows score the same from the bundle as from '
+              f'the pickled trees (normalised per tree; installed sklearn is newer than the pickle).')
+
+
+def shared_memory(workers):
+    procs = [subprocess.Popen([sys.executable, '-W', 'ignore', '-c', WORKER],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(workers)]
+    try:
+        return [json.loads(p.stdout.readline()) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='interpreter launches per timing')
+    parser.add_argument('--workers', type=int, default=4, help='processes for the memory check')
+    args = parser.parse_args()
+
+    check_parity()
+
+    pickles = sum(os.path.getsize(os.path.join(ML_DIR, n)) for n in MODEL_FILES)
+    bundle  = os.path.getsize(os.path.join(ML_DIR, BUNDLE_FILE))
+    print(f'\n{"":24}{"size":>10}{"load":>12}')
+    print(f'{"4 pickles + sklearn":24}{pickles / 1024:7.0f} KB'
+          f'{load_time(LOAD_PICKLES, args.runs) * 1e3:9.0f} ms')
+    print(f'{"mmap bundle":24}{bundle / 1024:7.0f} KB'
+          f'{load_time(LOAD_BUNDLE, args.runs) * 1e3:9.0f} ms')
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        return
+    print(f'\n{args.workers} worker processes with the bundle mapped (KB per process):')
+    print(f'{"":6}{"private":>10}{"shared":>10}')
+    for i, mem in enumerate(shared_memory(args.workers)):
+        private = mem.get('Private_Clean', 0) + mem.get('Private_Dirty', 0)
+        shared  = mem.get('Shared_Clean', 0) + mem.get('Shared_Dirty', 0)
+        print(f'{i:<6}{private:10,}{shared:10,}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Feature Extraction Benchmark
+Checks that PerformanceAnalyzer's numpy feature extractor produces exactly
+the features, scaled inputs and class probabilities of the pandas DataFrame
+path it replaced, then times both in single-row and batch mode.
+
+Run:  python benchmarks/feature_benchmark.py [--students 2000] [--repeats 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Importing app creates its database; point it at a scratch file, not the real one
+os.environ.setdefault('FLASK_SQLALCHEMY_DATABASE_URI',
+                      'sqlite:///' + os.path.join(tempfile.gettempdir(), 'feature_benchmark.db'))
+
+from app import FEATURE_COLS, ML_DIR, PerformanceAnalyzer, _load_ml_artifacts   # noqa: E402
+
+GRADES = ['A', 'B', 'C', 'D', 'E', 'F']
+
+
+def dataframe_row(student_results, attendance_rate=75.0, study_hours=5.0):
+    """The original dict-per-row feature builder that fed pd.DataFrame."""
+    scores = [float(r['score']) for r in student_results]
+    gpas   = [float(r.get('gpa', 0)) for r in student_results]
+    grades = [r.get('grade', 'F') for r in student_results]
+
+    avg_score      = np.mean(scores)
+    score_std      = np.std(scores) if len(scores) > 1 else 0.0
+    failed_courses = grades.count('F')
+    pass_rate      = (len(grades) - failed_courses) / len(grades) * 100
+    current_gpa    = gpas[-1] if gpas else 0.0
+    half           = max(len(scores) // 2, 1)
+    score_trend    = float(np.mean(scores[-half:])) - float(np.mean(scores[:half]))
+    prev_avg_score = float(np.mean(scores[:half]))
+
+    return {
+        'avg_score':            round(avg_score, 4),
+        'prev_avg_score':       round(prev_avg_score, 4),
+        'score_trend':          round(score_trend, 4),
+        'score_std':            round(score_std, 4),
+        'failed_courses':       failed_courses,
+        'gpa':                  round(current_gpa, 4),
+        'pass_rate':            round(pass_rate, 4),
+        'attendance_rate':      round(attendance_rate, 4),
+        'study_hours_per_week': round(study_hours, 4),
+        'num_courses':          len(scores),
+    }
+
+
+def dataframe_vector(student_results):
+    return pd.DataFrame([dataframe_row(student_results)], columns=FEATURE_COLS)
+
+
+def dataframe_matrix(results_list):
+    return pd.DataFrame([dataframe_row(res) for res in results_list], columns=FEATURE_COLS)
+
+
+def random_results(rng):
+    return [{'score': rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 2)]),
+             'grade': rng.choice(GRADES),
+             'gpa':   round(rng.uniform(0, 5), 2)}
+            for _ in range(rng.randint(1, 12))]
+
+
+def check_parity(analyzer, model, scaler, students):
+    X_old = dataframe_matrix(students)
+    X_new = analyzer._build_feature_matrix(students)
+    assert np.array_equal(X_old.to_numpy(dtype=np.float64), X_new), 'batch features differ'
+    for res in students:
+        assert np.array_equal(dataframe_vector(res).to_numpy(dtype=np.float64),
+                              analyzer._build_feature_vector(res)), f'features differ for {res}'
+    if not analyzer._ml_ready or scaler is None:
+        print('Model not loaded: features match, scaling/probabilities not checked.')
+        return
+    S_old = scaler.transform(X_old)
+    S_new = analyzer._scale(X_new)
+    assert np.array_equal(S_old, S_new), 'scaled features differ'
+    assert np.array_equal(model.predict_proba(S_old),
+                          model.predict_proba(S_new)), 'probabilities differ'
+    print(f'Parity OK: features, scaling and probabilities identical for {len(students):,} students.')
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--students', type=int, default=2000, help='students in the batch')
+    parser.add_argument('--repeats', type=int, default=2000, help='timed single-row calls')
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    analyzer = PerformanceAnalyzer()
+    # The analyzer scales with the model bundle; the pickled scaler is the reference
+    model, scaler, _ = _load_ml_artifacts(ML_DIR)
+    students = [random_results(rng) for _ in range(args.students)]
+    check_parity(analyzer, model, scaler, students)
+
+    one = students[0]
+    rows = [
+        ('single row: features', lambda: dataframe_vector(one),
+                                 lambda: analyzer._build_feature_vector(one), args.repeats),
+        (f'batch of {args.students:,}: features', lambda: dataframe_matrix(students),
+                                 lambda: analyzer._build_feature_matrix(students), 5),
+    ]
+    if analyzer._ml_ready and scaler is not None:
+        rows.append(('single row: features + scaling',
+                     lambda: scaler.transform(dataframe_vector(one)),
+                     lambda: analyzer._scale(analyzer._build_feature_vector(one)), args.repeats))
+        rows.append(('single row: model predict_proba (reference)',
+                     lambda: model.predict_proba(analyzer._scale(
+                         analyzer._build_feature_vector(one))),
+                     None, max(args.repeats // 20, 10)))
+
+    print(f'\n{"":44}{"DataFrame":>14}{"numpy":>14}')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for label, old, new, repeats in rows:
+            t_old = timed(old, repeats)
+            t_new = f'{timed(new, repeats):11.1f} us' if new else f'{"":14}'
+            print(f'{label:44}{t_old:11.1f} us{t_new}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Flat Forest Benchmark
+Trains a RandomForestClassifier the way app.py does, exports it with
+ml_engine.export_bundle, checks that FlatForest returns exactly sklearn's
+probabilities (including rows sitting on split thresholds), then times
+single-row and batch prediction for both.
+
+Run:  python benchmarks/forest_benchmark.py [--trees 200] [--rows 5000] [--repeats 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ml_engine import FlatForest, export_bundle, read_bundle   # noqa: E402
+
+ROOT         = os.path.join(os.path.dirname(__file__), '..')
+TRAINING_CSV = os.path.join(ROOT, 'ml_data', 'student_training_data.csv')
+FEATURE_COLS = [
+    'avg_score', 'prev_avg_score', 'score_trend', 'score_std',
+    'failed_courses', 'gpa', 'pass_rate',
+    'attendance_rate', 'study_hours_per_week', 'num_courses',
+]
+
+
+def probe_rows(X, forest, n_random, rng):
+    """Training rows, random rows, and rows placed exactly on split thresholds."""
+    internal = np.flatnonzero(forest.left != np.arange(len(forest.left)))
+    picks    = rng.choice(internal, size=min(n_random, len(internal)), replace=False)
+    on_split = X[rng.integers(0, len(X), len(picks))].copy()
+    on_split[np.arange(len(picks)), forest.feature[picks]] = forest.threshold[picks]
+    return np.vstack([X, rng.normal(scale=2.0, size=(n_random, X.shape[1])), on_split])
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trees', type=int, default=200, help='n_estimators')
+    parser.add_argument('--rows', type=int, default=5000, help='extra random rows to check')
+    parser.add_argument('--repeats', type=int, default=200, help='timed single-row calls')
+    args = parser.parse_args()
+    rng = np.random.default_rng(42)
+
+    df     = pd.read_csv(TRAINING_CSV)
+    le     = LabelEncoder()
+    y      = le.fit_transform(df['performance_label'])
+    scaler = StandardScaler()
+    X      = scaler.fit_transform(df[FEATURE_COLS])
+    # n_jobs=1 so sklearn sums the trees in a fixed order
+    rf = RandomForestClassifier(
+        n_estimators=args.trees, max_depth=12, min_samples_split=4, min_samples_leaf=2,
+        class_weight='balanced', random_state=42, n_jobs=1).fit(X, y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path   = export_bundle(rf, scaler, le, FEATURE_COLS, os.path.join(tmp, 'forest.bundle'))
+        arrays, meta = read_bundle(path)
+        # Copy the arrays out of the memory map so the directory can be removed
+        forest = FlatForest({name: np.array(a) for name, a in arrays.items()}, meta)
+        size   = os.path.getsize(path)
+
+    rows = probe_rows(X, forest, args.rows, rng)
+    assert np.array_equal(rf.predict_proba(rows), forest.predict_proba(rows)), 'probabilities differ'
+    assert np.array_equal(rf.predict(rows), forest.predict(rows)), 'labels differ'
+    assert np.array_equal(scaler.transform(df[FEATURE_COLS].to_numpy()),
+                          forest.transform(df[FEATURE_COLS].to_numpy())), 'scaling differs'
+    print(f'Parity OK: {len(rows):,} rows, identical probabilities and labels '
+          f'({forest.n_estimators} trees, {len(forest.feature):,} nodes, {size / 1024:.0f} KB).')
+
+    one = rows[:1]
+    print(f'\n{"":22}{"sklearn":>14}{"flat":>14}')
+    t_sk, t_flat = timed(lambda: rf.predict_proba(one), args.repeats), \
+                   timed(lambda: forest.predict_proba(one), args.repeats)
+    print(f'{"single row":22}{t_sk * 1e6:11.1f} us{t_flat * 1e6:11.1f} us')
+    for n in (16, 256, len(rows)):
+        batch = rows[:n]
+        t_sk, t_flat = timed(lambda: rf.predict_proba(batch), 3), \
+                       timed(lambda: forest.predict_proba(batch), 3)
+        print(f'{f"batch of {n:,}":22}{t_sk * 1e3:11.2f} ms{t_flat * 1e3:11.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
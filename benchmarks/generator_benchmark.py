@@ -0,0 +1,133 @@
+"""
+Training Data Generator Benchmark
+Times the original row-by-row generator loop against training_data's
+whole-array generator, checks that every vectorised row obeys the
+original per-row rules (labels, pass rate, value ranges) and that both
+produce the same label mix, then reports rows/s and peak memory for a
+large chunked npy run (and a smaller CSV one) in a fresh process.
+
+Run:  python benchmarks/generator_benchmark.py [--rows 20000] [--big-rows 2000000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+from training_data import LABELS, generate, write_training_data   # noqa: E402
+
+
+def legacy_label(avg, fails, gpa, trend):
+    if   avg >= 68 and fails == 0 and gpa >= 3.5: return 'Excellent'
+    elif avg >= 55 and fails <= 1 and gpa >= 2.5 and trend >= -3: return 'Good'
+    elif avg >= 45 and fails <= 2 and gpa >= 1.5: return 'Average'
+    else: return 'At-Risk'
+
+
+def legacy_generate(n_samples):
+    """The per-row loop generate_training_data.py and /admin/ml/generate used to run."""
+    def _g(s):
+        if s >= 70: return 'A'
+        elif s >= 60: return 'B'
+        elif s >= 50: return 'C'
+        elif s >= 45: return 'D'
+        elif s >= 40: return 'E'
+        else: return 'F'
+
+    def _gp(g): return {'A': 5, 'B': 4, 'C': 3, 'D': 2, 'E': 1, 'F': 0}.get(g, 0)
+
+    def _calc_gpa(sc, cu):
+        t = sum(cu)
+        return round(sum(_gp(_g(s)) * c for s, c in zip(sc, cu)) / t, 2) if t else 0.0
+
+    np.random.seed(42)
+    archetypes = [(78, 6, .15), (68, 7, .25), (57, 8, .30), (47, 9, .20), (35, 10, .10)]
+    labels = []
+    for i in range(n_samples):
+        idx       = np.random.choice(len(archetypes), p=[a[2] for a in archetypes])
+        ms, ss, _ = archetypes[idx]
+        nc    = np.random.randint(4, 8)
+        cu    = np.random.choice([2, 3, 4], size=nc)
+        sc    = np.clip(np.random.normal(ms, ss, nc), 0, 100).astype(int).tolist()
+        np.clip(np.random.normal(75 + (ms - 55) * .3, 10), 20, 100)
+        np.clip(np.random.normal(2 + (ms - 40) * .08, 1.5), 0, 12)
+        avg   = round(float(np.mean(sc)), 2)
+        fails = sum(1 for s in sc if s < 40)
+        gpa   = _calc_gpa(sc, cu.tolist())
+        prev  = round(float(np.clip(avg + np.random.normal(0, 5), 0, 100)), 2)
+        labels.append(legacy_label(avg, fails, gpa, avg - prev))
+        np.random.choice(['Computer Science', 'Engineering', 'Business', 'Medicine', 'Law', 'Arts'])
+        np.random.choice([100, 200, 300, 400])
+        np.random.choice(['First', 'Second'])
+    return labels
+
+
+def check_rows(chunk):
+    avg, prev = chunk['avg_score'], chunk['prev_avg_score']
+    fails, nc = chunk['failed_courses'], chunk['num_courses']
+    expected  = [legacy_label(a, f, g, a - p)
+                 for a, f, g, p in zip(avg.tolist(), fails.tolist(), chunk['gpa'].tolist(), prev.tolist())]
+    assert chunk['performance_label'].tolist() == expected, 'labels break the labelling rule'
+    assert np.array_equal(chunk['pass_rate'], np.round((nc - fails) / nc * 100, 2)), 'pass rate'
+    assert ((nc >= 4) & (nc <= 7)).all() and (fails <= nc).all(), 'course counts'
+    assert ((chunk['gpa'] >= 0) & (chunk['gpa'] <= 5)).all(), 'gpa range'
+    assert ((avg >= 0) & (avg <= 100)).all() and (chunk['score_std'] >= 0).all(), 'score range'
+
+
+def shares(labels):
+    values, counts = np.unique(np.asarray(labels), return_counts=True)
+    return dict(zip(values.tolist(), (counts / counts.sum()).tolist()))
+
+
+def run_isolated(path, rows, fmt):
+    """write_training_data in a fresh interpreter: (seconds, peak RSS in KB)."""
+    code = (f'import resource, sys, time; sys.path.insert(0, {ROOT!r})\n'
+            f'from training_data import write_training_data\n'
+            f'start = time.perf_counter()\n'
+            f'write_training_data({path!r}, {rows}, {fmt!r})\n'
+            f'print(time.perf_counter() - start, '
+            f'resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)')
+    out = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], check=True,
+                         capture_output=True, text=True).stdout.split()
+    return float(out[0]), int(out[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000, help='rows for the loop comparison')
+    parser.add_argument('--big-rows', type=int, default=2_000_000, help='rows for the npy run')
+    args = parser.parse_args()
+
+    start  = time.perf_counter()
+    legacy = legacy_generate(args.rows)
+    t_loop = time.perf_counter() - start
+    start  = time.perf_counter()
+    chunk  = next(generate(args.rows, chunk_rows=args.rows))
+    t_vec  = time.perf_counter() - start
+
+    check_rows(chunk)
+    old, new = shares(legacy), shares(chunk['performance_label'])
+    for label in LABELS.tolist():
+        assert abs(old.get(label, 0) - new.get(label, 0)) < 0.03, f'{label} share differs'
+    print(f'Rules OK: {args.rows:,} rows; label shares '
+          + ', '.join(f'{k} {old.get(k, 0):.1%}/{new.get(k, 0):.1%}' for k in LABELS.tolist())
+          + ' (loop/vectorised).')
+    print(f'\n{"":28}{"time":>10}{"rows/s":>14}')
+    print(f'{"row-by-row loop":28}{t_loop:9.2f}s{args.rows / t_loop:14,.0f}')
+    print(f'{"vectorised":28}{t_vec:9.2f}s{args.rows / t_vec:14,.0f}')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, rows in (('npy', args.big_rows), ('csv', args.big_rows // 10)):
+            elapsed, peak = run_isolated(os.path.join(tmp, f'data.{fmt}'), rows, fmt)
+            print(f'{f"chunked {fmt}, {rows:,} rows":28}{elapsed:9.2f}s{rows / elapsed:14,.0f}'
+                  f'   peak RSS {peak / 1024:,.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
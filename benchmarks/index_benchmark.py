@@ -0,0 +1,129 @@
+"""
+Index Benchmark
+Builds a throwaway SQLite database with database/schema.sql, fills it with
+synthetic results, and compares the query plans and timings of the hot
+lookups before and after the schema's indexes are created.
+
+Run:  python benchmarks/index_benchmark.py [--results 1000000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'schema.sql')
+
+N_COURSES   = 400
+SESSIONS    = ['2021/2022', '2022/2023', '2023/2024', '2024/2025']
+PER_STUDENT = 20
+
+# (label, SQL, parameter factory)
+QUERIES = [
+    ('results by student+session',
+     'SELECT * FROM results WHERE student_id = ? AND session = ?',
+     lambda n: (random.randint(1, n), random.choice(SESSIONS))),
+    ('results by course',
+     'SELECT COUNT(*) FROM results WHERE course_id = ?',
+     lambda n: (random.randint(1, N_COURSES),)),
+    ('upsert lookup (student, course, session)',
+     'SELECT id FROM results WHERE student_id = ? AND course_id = ? AND session = ?',
+     lambda n: (random.randint(1, n), random.randint(1, N_COURSES), random.choice(SESSIONS))),
+    ('summary by student+session+semester',
+     'SELECT * FROM session_summaries WHERE student_id = ? AND session = ? AND semester = ?',
+     lambda n: (random.randint(1, n), random.choice(SESSIONS), random.choice(['First', 'Second']))),
+    ('pending notifications for lecturer',
+     "SELECT COUNT(*) FROM delete_notifications WHERE status = 'pending' AND lecturer_id = ?",
+     lambda n: (random.randint(1, 50),)),
+]
+
+
+def split_schema():
+    with open(SCHEMA_PATH) as f:
+        text = '\n'.join(line for line in f if not line.lstrip().startswith('--'))
+    statements = [s.strip() for s in text.split(';') if s.strip()]
+    tables  = [s for s in statements if 'INDEX' not in s.upper()]
+    indexes = [s for s in statements if 'INDEX' in s.upper()]
+    return tables, indexes
+
+
+def populate(conn, n_results):
+    n_students = max(1, n_results // PER_STUDENT)
+    now = '2024-01-01 00:00:00'
+    conn.executemany('INSERT INTO courses VALUES (?, ?, ?, 3, ?, 300, 1, ?)',
+                     ((c, f'C{c:04d}', f'Course {c}', 'First' if c % 2 else 'Second', now)
+                      for c in range(1, N_COURSES + 1)))
+
+    def result_rows():
+        rid = 0
+        for s in range(1, n_students + 1):
+            for j in range(PER_STUDENT):
+                rid += 1
+                if rid > n_results:
+                    return
+                score = random.randint(0, 100)
+                yield (rid, s, (s * 7 + j) % N_COURSES + 1, SESSIONS[j % len(SESSIONS)],
+                       score, 'A', 5.0, 'Excellent', None, now, now)
+    conn.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', result_rows())
+
+    conn.executemany('INSERT INTO session_summaries VALUES (NULL, ?, ?, ?, 16, 60, 3.75, 3.75, ?)',
+                     ((s, sess, sem, now) for s in range(1, n_students + 1)
+                      for sess in SESSIONS for sem in ('First', 'Second')))
+    conn.executemany("INSERT INTO delete_notifications VALUES (NULL, ?, 1, ?, ?, NULL, NULL, ?, NULL)",
+                     ((random.randint(1, n_results), random.randint(1, 50),
+                       random.choice(['pending', 'approved', 'rejected']), now)
+                      for _ in range(max(1000, n_results // 100))))
+    conn.commit()
+    return n_students
+
+
+def measure(conn, n_students, repeats):
+    report = {}
+    for label, sql, params in QUERIES:
+        plan = ' | '.join(row[-1] for row in
+                          conn.execute('EXPLAIN QUERY PLAN ' + sql, params(n_students)))
+        start = time.perf_counter()
+        for _ in range(repeats):
+            conn.execute(sql, params(n_students)).fetchall()
+        report[label] = (plan, (time.perf_counter() - start) / repeats * 1000)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--results', type=int, default=1_000_000, help='number of result rows')
+    parser.add_argument('--repeats', type=int, default=20, help='timed runs per query')
+    args = parser.parse_args()
+    random.seed(42)
+
+    tables, indexes = split_schema()
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'bench.db'))
+        for stmt in tables:
+            conn.execute(stmt)
+
+        print(f'Populating {args.results:,} results...')
+        start = time.perf_counter()
+        n_students = populate(conn, args.results)
+        print(f'   {n_students:,} students, done in {time.perf_counter() - start:.1f}s')
+
+        before = measure(conn, n_students, args.repeats)
+        start = time.perf_counter()
+        for stmt in indexes:
+            conn.execute(stmt)
+        conn.execute('ANALYZE')
+        print(f'Created {len(indexes)} indexes in {time.perf_counter() - start:.1f}s')
+        after = measure(conn, n_students, args.repeats)
+        conn.close()
+
+    for label, _, _ in QUERIES:
+        (plan_b, ms_b), (plan_a, ms_a) = before[label], after[label]
+        print(f'\n{label}')
+        print(f'   before: {ms_b:9.3f} ms   {plan_b}')
+        print(f'   after:  {ms_a:9.3f} ms   {plan_a}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+SQLite Concurrency Stress Test
+Runs parallel writer and reader processes against a scratch database, once
+with SQLite's defaults (rollback journal, synchronous=FULL, 5 s timeout) and
+once with the connection profile app.py applies, and reports throughput and
+"database is locked" failures for each.
+
+Run:  python benchmarks/sqlite_stress.py [--writers 16] [--readers 16] [--seconds 10]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+# Mirrors the SQLITE_* defaults in app.py
+PROFILES = {
+    'default': {'timeout': 5.0, 'pragmas': []},
+    'tuned':   {'timeout': 15.0, 'pragmas': [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA busy_timeout=15000',
+        f'PRAGMA cache_size={-64 * 1024}',
+        f'PRAGMA mmap_size={256 * 1024 * 1024}',
+    ]},
+}
+
+N_STUDENTS = 2000
+
+
+def connect(path, profile):
+    conn = sqlite3.connect(path, timeout=profile['timeout'])
+    for pragma in profile['pragmas']:
+        conn.execute(pragma)
+    return conn
+
+
+def setup(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE results (id INTEGER PRIMARY KEY, student_id INTEGER, course_id INTEGER,
+                              session TEXT, score REAL, grade_point REAL);
+        CREATE INDEX ix_results_student_session ON results (student_id, session);
+        CREATE TABLE student_totals (student_id INTEGER PRIMARY KEY,
+                                     total_units INTEGER, total_points REAL);
+    ''')
+    conn.executemany('INSERT INTO student_totals VALUES (?, 0, 0)',
+                     ((s,) for s in range(1, N_STUDENTS + 1)))
+    conn.executemany('INSERT INTO results VALUES (NULL, ?, ?, ?, ?, ?)',
+                     ((random.randint(1, N_STUDENTS), random.randint(1, 200), '2023/2024',
+                       random.randint(0, 100), random.randint(0, 5)) for _ in range(50_000)))
+    conn.commit()
+    conn.close()
+
+
+def client(path, profile_name, role, deadline, counters):
+    random.seed(os.getpid())
+    conn = connect(path, PROFILES[profile_name])
+    ok = locked = 0
+    while time.time() < deadline:
+        sid = random.randint(1, N_STUDENTS)
+        try:
+            if role == 'writer':
+                # Shape of one enter_results POST: insert the result, bump the totals
+                gp = random.randint(0, 5)
+                conn.execute('INSERT INTO results VALUES (NULL, ?, ?, ?, ?, ?)',
+                             (sid, random.randint(1, 200), '2024/2025', random.randint(0, 100), gp))
+                conn.execute('UPDATE student_totals SET total_units = total_units + 3, '
+                             'total_points = total_points + ? WHERE student_id = ?', (gp * 3, sid))
+                conn.commit()
+            else:
+                conn.execute('SELECT score, grade_point FROM results WHERE student_id = ? '
+                             'AND session = ?', (sid, '2023/2024')).fetchall()
+                conn.execute('SELECT COUNT(*), AVG(score) FROM results').fetchone()
+            ok += 1
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            conn.rollback()
+            locked += 1
+    conn.close()
+    counters.put((role, ok, locked))
+
+
+def run(profile_name, writers, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'stress.db')
+        setup(path)
+        connect(path, PROFILES[profile_name]).close()   # switch journal mode up front
+        counters = mp.Queue()
+        deadline = time.time() + seconds
+        procs    = [mp.Process(target=client, args=(path, profile_name, role, deadline, counters))
+                    for role in ['writer'] * writers + ['reader'] * readers]
+        for p in procs:
+            p.start()
+        totals = {'writer': [0, 0], 'reader': [0, 0]}
+        for _ in procs:
+            role, ok, locked = counters.get()
+            totals[role][0] += ok
+            totals[role][1] += locked
+        for p in procs:
+            p.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f'{args.writers} writers + {args.readers} readers for {args.seconds:.0f}s per profile\n')
+    print(f'{"profile":10s} {"writes/s":>10s} {"reads/s":>10s} {"locked errors":>14s}')
+    for name in PROFILES:
+        t = run(name, args.writers, args.readers, args.seconds)
+        print(f'{name:10s} {t["writer"][0] / args.seconds:10.1f} '
+              f'{t["reader"][0] / args.seconds:10.1f} {t["writer"][1] + t["reader"][1]:14d}')
+
+
+if __name__ == '__main__':
+    main()
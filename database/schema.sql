@@ -7,7 +7,10 @@ CREATE TABLE IF NOT EXISTS users (
     email VARCHAR(100) NOT NULL UNIQUE,
     password_hash VARCHAR(255) NOT NULL,
     role VARCHAR(20) NOT NULL,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    full_name VARCHAR(100),
+    department_id INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (department_id) REFERENCES departments(id)
 );
 
 CREATE TABLE IF NOT EXISTS departments (
@@ -52,10 +55,12 @@ CREATE TABLE IF NOT EXISTS results (
     grade VARCHAR(2),
     grade_point REAL,
     remarks VARCHAR(50),
+    entered_by INTEGER,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (student_id) REFERENCES students(id),
-    FOREIGN KEY (course_id) REFERENCES courses(id)
+    FOREIGN KEY (course_id) REFERENCES courses(id),
+    FOREIGN KEY (entered_by) REFERENCES users(id)
 );
 
 CREATE TABLE IF NOT EXISTS session_summaries (
@@ -70,3 +75,92 @@ CREATE TABLE IF NOT EXISTS session_summaries (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (student_id) REFERENCES students(id)
 );
+
+CREATE TABLE IF NOT EXISTS delete_notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    result_id INTEGER NOT NULL,
+    requested_by INTEGER NOT NULL,
+    lecturer_id INTEGER NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending',
+    admin_message VARCHAR(255),
+    lecturer_note VARCHAR(255),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    responded_at DATETIME,
+    FOREIGN KEY (result_id) REFERENCES results(id),
+    FOREIGN KEY (requested_by) REFERENCES users(id),
+    FOREIGN KEY (lecturer_id) REFERENCES users(id)
+);
+
+CREATE TABLE IF NOT EXISTS student_totals (
+    student_id INTEGER PRIMARY KEY,
+    total_units INTEGER NOT NULL DEFAULT 0,
+    total_points REAL NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(id)
+);
+
+-- The model's feature vector per student, rewritten with every result change
+CREATE TABLE IF NOT EXISTS student_features (
+    student_id INTEGER PRIMARY KEY,
+    avg_score REAL NOT NULL,
+    prev_avg_score REAL NOT NULL,
+    score_trend REAL NOT NULL,
+    score_std REAL NOT NULL,
+    failed_courses REAL NOT NULL,
+    gpa REAL NOT NULL,
+    pass_rate REAL NOT NULL,
+    attendance_rate REAL NOT NULL,
+    study_hours_per_week REAL NOT NULL,
+    num_courses REAL NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(id)
+);
+
+-- Last model prediction per student, served by /admin/analytics
+CREATE TABLE IF NOT EXISTS risk_snapshot (
+    student_id INTEGER PRIMARY KEY,
+    label VARCHAR(30) NOT NULL,
+    probabilities TEXT NOT NULL DEFAULT '{}',
+    model_version VARCHAR(40) NOT NULL,
+    features_updated_at DATETIME,
+    computed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(id)
+);
+
+-- Indexes for the hot lookup paths (kept in sync with the SQLAlchemy models)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_results_student_course_session
+    ON results (student_id, course_id, session);
+CREATE INDEX IF NOT EXISTS ix_results_student_session
+    ON results (student_id, session);
+CREATE INDEX IF NOT EXISTS ix_results_course_id
+    ON results (course_id);
+CREATE INDEX IF NOT EXISTS ix_session_summaries_student_session_semester
+    ON session_summaries (student_id, session, semester);
+CREATE INDEX IF NOT EXISTS ix_delete_notifications_status_lecturer
+    ON delete_notifications (status, lecturer_id);
+CREATE INDEX IF NOT EXISTS ix_results_created_at_id
+    ON results (created_at, id);
+
+-- Case-insensitive indexes behind the typeahead prefix searches
+CREATE INDEX IF NOT EXISTS ix_students_matric_nocase
+    ON students (matric_number COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_students_first_name_nocase
+    ON students (first_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_students_last_name_nocase
+    ON students (last_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_courses_code_nocase
+    ON courses (course_code COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_courses_title_nocase
+    ON courses (course_title COLLATE NOCASE);
+
+-- Per-department counts on the Departments page
+CREATE INDEX IF NOT EXISTS ix_students_department_id
+    ON students (department_id);
+CREATE INDEX IF NOT EXISTS ix_courses_department_id
+    ON courses (department_id);
+CREATE INDEX IF NOT EXISTS ix_users_role_department
+    ON users (role, department_id);
+
+-- At-risk list on the Analytics page
+CREATE INDEX IF NOT EXISTS ix_risk_snapshot_label
+    ON risk_snapshot (label);
@@ -0,0 +1,610 @@
+"""
+Flat-Array Forest Evaluator
+Flattens a trained RandomForestClassifier, its scaler and label encoder into
+one model bundle file of contiguous numpy arrays, and evaluates it without
+sklearn, so a single-row prediction skips sklearn's per-call input
+validation and joblib dispatch. The bundle is memory-mapped read-only, so
+every process that loads the same file shares its pages.
+
+Also holds the scoring and advice rules for a feature row (for processes
+that do not import app.py), the training routine app.py runs in a
+background process and the on-disk model registry it publishes to.
+
+Export after training:   export_bundle(rf, scaler, encoder, feature_cols, path)
+Export the current model: python ml_engine.py
+"""
+
+import os
+import json
+import struct
+import datetime
+
+import numpy as np
+
+BUNDLE_FILE   = 'performance_model.bundle'
+MODEL_FILES   = ('performance_model.pkl', 'scaler.pkl', 'label_encoder.pkl', 'feature_names.pkl')
+METADATA_FILE = 'metadata.json'
+ACTIVE_FILE   = 'ACTIVE'
+BUNDLED       = 'bundled'   # version name of the model shipped in ml_data/
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BUNDLE FORMAT
+#   8 bytes   magic  b'SRMSMDL\0'
+#   4 bytes   format version (little-endian uint32)
+#   4 bytes   header length  (little-endian uint32)
+#   header    UTF-8 JSON: {'meta': {...}, 'arrays': {name: {dtype, shape, offset}}}
+#   arrays    raw little-endian C-order data, each starting on a 64-byte boundary
+# ══════════════════════════════════════════════════════════════════════════════
+BUNDLE_MAGIC   = b'SRMSMDL\0'
+BUNDLE_FORMAT  = 1
+BUNDLE_ALIGN   = 64
+_BUNDLE_PREFIX = struct.Struct('<8sII')
+
+
+def _aligned(n):
+    return -(-n // BUNDLE_ALIGN) * BUNDLE_ALIGN
+
+
+def write_bundle(path, arrays, meta):
+    """Write arrays ({name: ndarray}) and JSON-able meta to path atomically."""
+    arrays = {name: np.ascontiguousarray(a, dtype=np.asarray(a).dtype.newbyteorder('<'))
+              for name, a in arrays.items()}
+
+    def _header(offsets):
+        return json.dumps({'meta': meta, 'arrays': {
+            name: {'dtype': a.dtype.str, 'shape': list(a.shape), 'offset': offsets[name]}
+            for name, a in arrays.items()}}).encode('utf-8')
+
+    # Offsets depend on the header's length and vice versa; settle on a fixed point
+    offsets = dict.fromkeys(arrays, 0)
+    while True:
+        header = _header(offsets)
+        pos    = _aligned(_BUNDLE_PREFIX.size + len(header))
+        placed = {}
+        for name, a in arrays.items():
+            placed[name] = pos
+            pos = _aligned(pos + a.nbytes)
+        if placed == offsets:
+            break
+        offsets = placed
+
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_BUNDLE_PREFIX.pack(BUNDLE_MAGIC, BUNDLE_FORMAT, len(header)))
+        f.write(header)
+        for name, a in arrays.items():
+            f.seek(offsets[name])
+            f.write(a.tobytes())
+        f.truncate(max([_aligned(_BUNDLE_PREFIX.size + len(header))] +
+                       [offsets[n] + a.nbytes for n, a in arrays.items()]))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def read_bundle(path):
+    """(arrays, meta) from a bundle; arrays are read-only views of one memory map."""
+    with open(path, 'rb') as f:
+        magic, fmt, header_len = _BUNDLE_PREFIX.unpack(f.read(_BUNDLE_PREFIX.size))
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f'{path} is not a model bundle')
+        if fmt != BUNDLE_FORMAT:
+            raise ValueError(f'{path} uses bundle format {fmt}; this build reads {BUNDLE_FORMAT}')
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+    buf    = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype  = np.dtype(spec['dtype'])
+        count  = int(np.prod(spec['shape'], dtype=np.int64))
+        start  = spec['offset']
+        arrays[name] = buf[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+    return arrays, header['meta']
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EXPORT
+# ══════════════════════════════════════════════════════════════════════════════
+
+def export_bundle(model, scaler, encoder, feature_cols, path):
+    """Write model with the scaler and label encoder it is used with to path.
+
+    Every tree's nodes are concatenated into one set of arrays and child
+    indices are rebased onto them. Leaves point to themselves so that a
+    fixed number of vectorised steps walks every row to its leaf. Leaf
+    values are stored already normalised, exactly as DecisionTreeClassifier
+    .predict_proba normalises them.
+
+    The scaler is stored as its mean/scale vectors rather than folded into
+    the thresholds: sklearn compares float32-cast *scaled* inputs against
+    the thresholds, and folding the scaler in would move values that sit on
+    a split boundary to the other side.
+    """
+    trees   = [est.tree_ for est in model.estimators_]
+    offsets = np.cumsum([0] + [t.node_count for t in trees])
+    n_nodes = int(offsets[-1])
+    n_cls   = len(model.classes_)
+
+    feature   = np.zeros(n_nodes, dtype=np.int32)
+    threshold = np.zeros(n_nodes, dtype=np.float64)
+    left      = np.empty(n_nodes, dtype=np.int32)
+    right     = np.empty(n_nodes, dtype=np.int32)
+    value     = np.empty((n_nodes, n_cls), dtype=np.float64)
+
+    for tree, start in zip(trees, offsets[:-1]):
+        end   = start + tree.node_count
+        nodes = np.arange(start, end, dtype=np.int32)
+        leaf  = tree.children_left == -1
+
+        feature[start:end]   = np.where(leaf, 0, tree.feature)
+        threshold[start:end] = np.where(leaf, 0.0, tree.threshold)
+        left[start:end]      = np.where(leaf, nodes, tree.children_left + start)
+        right[start:end]     = np.where(leaf, nodes, tree.children_right + start)
+
+        proba      = tree.value[:, 0, :n_cls].astype(np.float64)
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        if not np.allclose(normalizer[normalizer != 0.0], 1.0):
+            # Trees from sklearn < 1.4 hold class counts, normalised at predict time
+            normalizer[normalizer == 0.0] = 1.0
+            proba = proba / normalizer
+        value[start:end] = proba
+
+    mean  = scaler.mean_  if scaler.with_mean else np.zeros(scaler.n_features_in_)
+    scale = scaler.scale_ if scaler.with_std  else np.ones(scaler.n_features_in_)
+
+    return write_bundle(path, {
+        'feature': feature, 'threshold': threshold, 'left': left, 'right': right,
+        'value':   value,
+        'roots':   offsets[:-1].astype(np.int32),
+        'classes': np.asarray(model.classes_, dtype=np.int64),
+        'mean':    np.asarray(mean, dtype=np.float64),
+        'scale':   np.asarray(scale, dtype=np.float64),
+    }, {
+        'depth':        int(max(t.max_depth for t in trees)),
+        'labels':       [str(c) for c in encoder.classes_],
+        'feature_cols': list(feature_cols),
+    })
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EVALUATOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+class FlatForest:
+    """Pure-numpy stand-in for a fitted RandomForestClassifier.
+
+    predict_proba / predict take already-scaled rows, like the sklearn model
+    they replace, and return the same values as sklearn evaluating the trees
+    one after another (n_jobs=1). labels and transform() stand in for the
+    label encoder and scaler exported with it.
+    """
+
+    def __init__(self, arrays, meta):
+        self.feature   = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left      = arrays['left']
+        self.right     = arrays['right']
+        self.value     = arrays['value']
+        self.roots     = arrays['roots']
+        self.classes_  = arrays['classes']
+        self.mean      = arrays['mean']
+        self.scale     = arrays['scale']
+        self.depth     = meta['depth']
+        self.labels    = np.array(meta['labels'], dtype=object)
+        self.feature_cols = meta['feature_cols']
+        self.n_estimators = len(self.roots)
+
+    @classmethod
+    def load(cls, path):
+        return cls(*read_bundle(path))
+
+    def apply(self, X):
+        """Leaf index reached in every tree: an (n_rows, n_trees) array."""
+        # sklearn runs trees on float32 input and compares against float64 thresholds
+        X    = np.asarray(X, dtype=np.float32).astype(np.float64)
+        flat = X.ravel()
+        base = (np.arange(len(X), dtype=np.intp) * X.shape[1])[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            go_left = flat.take(base + self.feature.take(node)) <= self.threshold.take(node)
+            node    = np.where(go_left, self.left.take(node), self.right.take(node))
+        return node
+
+    def predict_proba(self, X):
+        # cumsum adds the trees in order, like sklearn's running total
+        proba = self.value.take(self.apply(X), axis=0).cumsum(axis=1)[:, -1]
+        return proba / self.n_estimators
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def matches(self, model):
+        """True when this export was taken from model (a fitted RandomForestClassifier)."""
+        trees = [est.tree_ for est in model.estimators_]
+        if len(trees) != self.n_estimators or \
+                sum(t.node_count for t in trees) != len(self.feature):
+            return False
+        first    = trees[0]
+        internal = first.children_left != -1
+        return bool(np.array_equal(self.threshold[:first.node_count][internal],
+                                   first.threshold[internal]))
+
+    def transform(self, X):
+        """The exported StandardScaler's transform."""
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+
+
+def load_forest(path):
+    """FlatForest from a bundle, or None when it is missing or unreadable."""
+    try:
+        return FlatForest.load(path)
+    except (OSError, KeyError, ValueError, struct.error):
+        return None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SCORING
+# What app.py's PerformanceAnalyzer does with a feature row, for processes
+# that only have the bundle (score_students.py's workers).
+# ══════════════════════════════════════════════════════════════════════════════
+ADVICE = {
+    'Excellent': [
+        'ML Analysis: Excellent performance — keep up the outstanding work!',
+        'Consider mentoring peers to reinforce and deepen your knowledge.',
+    ],
+    'Good': [
+        'ML Analysis: Good performance. Focus on maintaining consistency.',
+        'Target weak areas to move from Good to Excellent standing.',
+    ],
+    'Average': [
+        'ML Analysis: Average performance. Increase study time and seek help proactively.',
+        'Join study groups and utilise office hours for challenging topics.',
+    ],
+    'At-Risk': [
+        'WARNING - ML Analysis: You are academically at risk. Seek immediate academic support.',
+        'Meet with your lecturer and academic advisor as soon as possible.',
+        'Consider enrolling in the university study-skills and time-management workshop.',
+    ],
+}
+
+
+def score_features(forest, X):
+    """[(label, {class: p})] for feature rows X, in the analyzer's batch format.
+
+    Rows with fewer than two results are 'Insufficient Data' and not scored.
+    """
+    X      = np.asarray(X, dtype=np.float64)
+    scored = [('Insufficient Data', {})] * len(X)
+    rows   = np.flatnonzero(X[:, forest.feature_cols.index('num_courses')] >= 2)
+    if len(rows):
+        probs  = forest.predict_proba(forest.transform(X[rows]))
+        labels = forest.labels.take(forest.classes_.take(np.argmax(probs, axis=1)))
+        for i, label, row in zip(rows.tolist(), labels, probs.tolist()):
+            scored[i] = (label, {cls: round(p, 4) for cls, p in zip(forest.labels, row)})
+    return scored
+
+
+def recommendations(prediction, proba, failed_count, current_gpa):
+    """Advice for a student from their prediction, failed courses and CGPA."""
+    recs = list(ADVICE.get(prediction, ['Prediction unavailable.']))
+    if proba:
+        conf = proba.get(prediction, 0)
+        if conf < 0.6:
+            recs.append(f'Note: Prediction confidence is {conf*100:.0f}%. '
+                        'Submit more results for a more reliable analysis.')
+    if failed_count > 0:
+        recs.append(f'You have {failed_count} failed course(s). '
+                    'Plan retakes and dedicate extra time to those subjects.')
+    if current_gpa < 2.0:
+        recs.append('Your GPA is below 2.0 — urgent action required to avoid academic probation.')
+    elif current_gpa >= 4.5:
+        recs.append('First Class standing! Maintain this excellence for graduation honours.')
+    return recs
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MODEL REGISTRY
+# registry/<version>/   one immutable directory per trained model, holding
+#                       BUNDLE_FILE, MODEL_FILES and METADATA_FILE
+# registry/ACTIVE       name of the version in use, replaced atomically
+# Without an ACTIVE pointer (or with it set to BUNDLED) the model shipped in
+# ml_data/ is used.
+# ══════════════════════════════════════════════════════════════════════════════
+
+def new_version_id():
+    return datetime.datetime.utcnow().strftime('%Y%m%d-%H%M%S-') + os.urandom(2).hex()
+
+
+def _write_atomic(path, text):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_metadata(version_dir):
+    try:
+        with open(os.path.join(version_dir, METADATA_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def publish_version(registry_dir, staging_dir, metadata):
+    """Turn a directory of freshly written artefacts into a registry version.
+
+    metadata.json is written into staging_dir, then the whole directory is
+    renamed into the registry in one step, so a version is either complete
+    or absent. staging_dir must be on the same filesystem as registry_dir.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+    version  = new_version_id()
+    metadata = dict(metadata, version=version,
+                    created_at=datetime.datetime.utcnow().isoformat(timespec='seconds'))
+    _write_atomic(os.path.join(staging_dir, METADATA_FILE), json.dumps(metadata, indent=2))
+    os.replace(staging_dir, os.path.join(registry_dir, version))
+    return version
+
+
+def list_versions(registry_dir):
+    """Metadata of every registered version, oldest first."""
+    try:
+        names = os.listdir(registry_dir)
+    except OSError:
+        return []
+    versions = [read_metadata(os.path.join(registry_dir, name)) for name in names
+                if os.path.isfile(os.path.join(registry_dir, name, METADATA_FILE))]
+    return sorted((m for m in versions if m.get('version')), key=lambda m: m['version'])
+
+
+def read_active(registry_dir):
+    try:
+        with open(os.path.join(registry_dir, ACTIVE_FILE), encoding='utf-8') as f:
+            return f.read().strip() or BUNDLED
+    except OSError:
+        return BUNDLED
+
+
+def set_active(registry_dir, version):
+    if version != BUNDLED and not os.path.isdir(os.path.join(registry_dir, version)):
+        raise ValueError(f'Unknown model version {version!r}')
+    os.makedirs(registry_dir, exist_ok=True)
+    _write_atomic(os.path.join(registry_dir, ACTIVE_FILE), version)
+
+
+def version_dir(registry_dir, version, bundled_dir):
+    return bundled_dir if version == BUNDLED else os.path.join(registry_dir, version)
+
+
+def active_model_dir(registry_dir, bundled_dir):
+    """(version, directory) of the model currently in use."""
+    version = read_active(registry_dir)
+    path    = version_dir(registry_dir, version, bundled_dir)
+    if version != BUNDLED and not os.path.isdir(path):
+        return BUNDLED, bundled_dir
+    return version, path
+
+
+def prune_versions(registry_dir, keep):
+    """Delete all but the newest keep versions, never the active one."""
+    import shutil
+
+    active = read_active(registry_dir)
+    for meta in list_versions(registry_dir)[:-keep or None]:
+        if meta['version'] != active:
+            shutil.rmtree(os.path.join(registry_dir, meta['version']), ignore_errors=True)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TRAINING (runs in a child process started by app.py's job runner)
+# Training data is streamed in chunks with float32 features, never loaded
+# whole: a first pass counts the classes and, only when the file holds more
+# than max_rows rows, a second pass draws a stratified sample of max_rows
+# rows. The scaler is fitted on the sample's training split alone, so the
+# held-out test rows stay unseen until evaluation.
+# ══════════════════════════════════════════════════════════════════════════════
+LABEL_COL           = 'performance_label'
+TRAINING_CHUNK_ROWS = 200_000
+TRAINING_MAX_ROWS   = 500_000
+
+
+def iter_training_chunks(path, feature_cols, chunk_rows=TRAINING_CHUNK_ROWS):
+    """Yield (X, y) chunks of a training CSV, or of an npy directory from training_data.
+
+    X is float32 with feature_cols as columns, y the string labels.
+    """
+    if os.path.isdir(path):
+        from training_data import read_npy
+        columns = read_npy(path)
+        n_rows  = len(columns[LABEL_COL])
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            X = np.empty((stop - start, len(feature_cols)), dtype=np.float32)
+            for j, col in enumerate(feature_cols):
+                X[:, j] = columns[col][start:stop]
+            yield X, columns[LABEL_COL][start:stop].astype(str)
+        return
+
+    import pandas as pd
+    dtypes = dict.fromkeys(feature_cols, np.float32)
+    dtypes[LABEL_COL] = str
+    for df in pd.read_csv(path, usecols=[*feature_cols, LABEL_COL], dtype=dtypes,
+                          chunksize=chunk_rows):
+        yield df[list(feature_cols)].to_numpy(), df[LABEL_COL].to_numpy(dtype=str)
+
+
+def load_training_sample(path, feature_cols, progress, max_rows=TRAINING_MAX_ROWS,
+                         chunk_rows=TRAINING_CHUNK_ROWS, seed=42):
+    """Stream path once or twice; return (X, y, total_rows).
+
+    The file's metadata sidecar is written if it has none. X (float32,
+    unscaled) and y hold every row in file order when there are at most
+    max_rows, otherwise a sample that keeps each class's share of the file:
+    each class keeps the rows that drew its smallest random keys, a
+    reservoir that never holds more than its quota plus one chunk.
+    """
+    counts, kept, total = {}, [], 0
+    for X, y in iter_training_chunks(path, feature_cols, chunk_rows):
+        for label, n in zip(*np.unique(y, return_counts=True)):
+            counts[label] = counts.get(label, 0) + int(n)
+        total += len(y)
+        if total <= max_rows:
+            kept.append((X, y))
+        else:
+            kept = None
+        progress(f'Reading training data: {total:,} rows', 2)
+    if not total:
+        raise ValueError('The training data has no rows.')
+    from training_data import data_columns, read_sidecar, write_sidecar
+    if read_sidecar(path) is None:
+        write_sidecar(path, total, counts, data_columns(path))
+    if kept is not None:
+        return np.concatenate([X for X, _ in kept]), np.concatenate([y for _, y in kept]), total
+
+    quotas     = {label: max(1, round(n * max_rows / total)) for label, n in counts.items()}
+    reservoirs = {label: (np.empty(0), np.empty((0, len(feature_cols)), np.float32))
+                  for label in counts}
+    rng, seen  = np.random.default_rng(seed), 0
+    for X, y in iter_training_chunks(path, feature_cols, chunk_rows):
+        keys = rng.random(len(y))
+        for label, (res_keys, res_X) in reservoirs.items():
+            mask = y == label
+            if not mask.any():
+                continue
+            res_keys = np.concatenate([res_keys, keys[mask]])
+            res_X    = np.concatenate([res_X, X[mask]])
+            if len(res_keys) > quotas[label]:
+                keep = np.argpartition(res_keys, quotas[label] - 1)[:quotas[label]]
+                res_keys, res_X = res_keys[keep], res_X[keep]
+            reservoirs[label] = (res_keys, res_X)
+        seen += len(y)
+        progress(f'Sampling {max_rows:,} of {total:,} rows', 2 + 6 * seen // total)
+    X = np.concatenate([res_X for _, res_X in reservoirs.values()])
+    y = np.concatenate([np.full(len(res_X), label) for label, (_, res_X) in reservoirs.items()])
+    return X, y, total
+
+
+def train_model(csv_path, out_dir, n_estimators, feature_cols, progress,
+                max_rows=TRAINING_MAX_ROWS, chunk_rows=TRAINING_CHUNK_ROWS):
+    """Fit and evaluate the performance model and write its artefacts to out_dir.
+
+    csv_path is a training CSV or an npy training directory; it is read in
+    chunks of chunk_rows and the forest is fitted on at most max_rows rows
+    (see load_training_sample). progress(phase, percent) is called as the
+    work advances. Returns the summary the admin dashboard shows, with the
+    peak memory tracemalloc saw. Cross-validation is run fold by fold so
+    each fold can be reported; the folds and scores are the same as
+    cross_val_score(cv=5, scoring='accuracy').
+    """
+    import pickle
+    import tracemalloc
+
+    from sklearn.base import clone
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, classification_report
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    tracing = not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    try:
+        progress('Reading training data', 2)
+        X, y, total_rows = load_training_sample(
+            csv_path, feature_cols, progress, max_rows, chunk_rows)
+        le    = LabelEncoder()
+        y_enc = le.fit_transform(y)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y_enc, test_size=0.2, random_state=42, stratify=y_enc)
+        del X
+
+        progress('Scaling features', 8)
+        # Fitted on the training split only, so the test accuracy is measured
+        # on rows the scaler never saw; scaled in float64, exactly as rows
+        # are scaled at prediction time
+        scaler    = StandardScaler()
+        X_train_s = scaler.fit_transform(X_train.astype(np.float64))
+        X_test_s  = scaler.transform(X_test.astype(np.float64))
+        del X_train, X_test
+
+        progress(f'Fitting {n_estimators} trees', 12)
+        rf = RandomForestClassifier(
+            n_estimators=n_estimators, max_depth=12,
+            min_samples_split=4, min_samples_leaf=2,
+            class_weight='balanced', random_state=42, n_jobs=-1)
+        rf.fit(X_train_s, y_train)
+
+        folds     = list(StratifiedKFold(n_splits=5).split(X_train_s, y_train))
+        cv_scores = []
+        for i, (fit_idx, val_idx) in enumerate(folds):
+            progress(f'Cross-validation fold {i + 1}/{len(folds)}', 30 + 60 * i // len(folds))
+            fold_rf = clone(rf).fit(X_train_s[fit_idx], y_train[fit_idx])
+            cv_scores.append(accuracy_score(y_train[val_idx], fold_rf.predict(X_train_s[val_idx])))
+        cv_scores = np.array(cv_scores)
+
+        progress('Evaluating on the test split', 92)
+        y_pred   = rf.predict(X_test_s)
+        test_acc = float(accuracy_score(y_test, y_pred))
+        report   = classification_report(y_test, y_pred, target_names=le.classes_, output_dict=True)
+
+        progress('Saving model', 96)
+        os.makedirs(out_dir, exist_ok=True)
+        for name, obj in zip(MODEL_FILES, [rf, scaler, le, list(feature_cols)]):
+            with open(os.path.join(out_dir, name), 'wb') as f:
+                pickle.dump(obj, f)
+        export_bundle(rf, scaler, le, feature_cols, os.path.join(out_dir, BUNDLE_FILE))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if tracing:
+            tracemalloc.stop()
+
+    importances = dict(sorted(
+        {f: round(float(v), 4) for f, v in zip(feature_cols, rf.feature_importances_)}.items(),
+        key=lambda x: x[1], reverse=True))
+    return {
+        'test_accuracy':      round(test_acc * 100, 2),
+        'cv_accuracy':        round(float(cv_scores.mean()) * 100, 2),
+        'cv_std':             round(float(cv_scores.std()) * 100, 2),
+        'n_estimators':       n_estimators,
+        'training_rows':      total_rows,
+        'sampled_rows':       len(y_enc),
+        'peak_memory_mb':     round(peak / 2**20, 1),
+        'per_class':          {cls: {
+                                    'precision': round(report[cls]['precision'], 3),
+                                    'recall':    round(report[cls]['recall'], 3),
+                                    'f1':        round(report[cls]['f1-score'], 3),
+                                    'support':   int(report[cls]['support']),
+                               } for cls in le.classes_},
+        'feature_importance': importances,
+    }
+
+
+def run_training_job(queue, csv_path, out_dir, n_estimators, feature_cols):
+    """Process target: train_model with progress and the outcome sent over queue.
+
+    Messages are ('progress', phase, percent), then ('done', summary) or
+    ('error', message).
+    """
+    try:
+        summary = train_model(csv_path, out_dir, n_estimators, feature_cols,
+                              lambda phase, pct: queue.put(('progress', phase, pct)))
+        queue.put(('done', summary))
+    except Exception as e:
+        queue.put(('error', str(e)))
+
+
+if __name__ == '__main__':
+    import pickle
+
+    ml_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ml_data')
+    artefacts = []
+    for name in MODEL_FILES:
+        with open(os.path.join(ml_dir, name), 'rb') as f:
+            artefacts.append(pickle.load(f))
+    model, scaler, encoder, feature_cols = artefacts
+    out = export_bundle(model, scaler, encoder, feature_cols, os.path.join(ml_dir, BUNDLE_FILE))
+    print(f'✅ Model bundle exported → {out}')
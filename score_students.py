@@ -0,0 +1,140 @@
+"""
+Nightly Risk Report
+Scores every student with the active model and writes one CSV row each:
+prediction, class probabilities and recommendations.
+Run:  python score_students.py [--workers 4] [--chunk-size 5000] [--out PATH]
+
+Students are read from the database in chunks of their stored feature rows
+(student_features) and latest session CGPA, and scored in worker processes.
+Workers import only ml_engine and memory-map the model bundle, so they share
+its pages instead of each loading a copy; the parent writes the scored
+chunks in order.
+"""
+
+import argparse
+import csv
+import datetime
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ml_engine import BUNDLE_FILE, FlatForest, load_forest, recommendations, score_features
+
+DEFAULT_CHUNK_SIZE = 5000
+NO_RESULTS_ADVICE  = ['Insufficient data for recommendations.']
+
+_forest = None   # each worker's memory-mapped model
+
+
+def _init_worker(bundle_path):
+    global _forest
+    _forest = FlatForest.load(bundle_path)
+
+
+def score_chunk(X, cgpa):
+    """Worker: [(prediction, {class: p}, [recommendations])] for each feature row."""
+    n_col    = _forest.feature_cols.index('num_courses')
+    fail_col = _forest.feature_cols.index('failed_courses')
+    scored   = []
+    for row, (label, proba), gpa in zip(X, score_features(_forest, X), cgpa):
+        if row[n_col] == 0:
+            recs = NO_RESULTS_ADVICE
+        else:
+            recs = recommendations(label, proba, int(row[fail_col]), gpa)
+        scored.append((label, proba, recs))
+    return scored
+
+
+def read_chunks(chunk_size, feature_cols):
+    """Yield (student rows, feature matrix, cgpa list) for chunk_size students
+    at a time, in id order; a student without results gets a zero feature row."""
+    from app import db, Department, Student, StudentFeatures, latest_cgpa_subquery
+
+    latest  = latest_cgpa_subquery()
+    columns = [getattr(StudentFeatures, col) for col in feature_cols]
+    query   = db.session.query(Student.id, Student.matric_number, Student.first_name,
+                               Student.last_name, Department.name, Student.level,
+                               latest.c.cgpa, *columns)\
+        .outerjoin(Department, Department.id == Student.department_id)\
+        .outerjoin(latest, latest.c.student_id == Student.id)\
+        .outerjoin(StudentFeatures, StudentFeatures.student_id == Student.id)\
+        .order_by(Student.id)
+    last_id = 0
+    while True:
+        rows = query.filter(Student.id > last_id).limit(chunk_size).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        X    = np.array([[v or 0.0 for v in row[7:]] for row in rows], dtype=np.float64)
+        cgpa = [row[6] or 0.0 for row in rows]
+        yield [row[:6] for row in rows], X, cgpa
+
+
+def write_rows(writer, students, cgpa, scored, labels):
+    for (_, matric, first, last, department, level), gpa, (label, proba, recs) \
+            in zip(students, cgpa, scored):
+        writer.writerow([matric, f'{first} {last}', department or '', level, f'{gpa:.2f}', label,
+                         *(proba.get(cls, '') for cls in labels), ' | '.join(recs)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a risk report for every student.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='scoring processes (default: one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='students read and scored at a time')
+    parser.add_argument('--out', default=f'risk_report_{datetime.date.today():%Y%m%d}.csv',
+                        help='output CSV (default risk_report_<date>.csv)')
+    args = parser.parse_args()
+
+    # Importing app only defines its models: no seeding, no background threads
+    from app import app, ML_DIR, ML_REGISTRY_DIR
+    from ml_engine import active_model_dir
+
+    version, model_dir = active_model_dir(ML_REGISTRY_DIR, ML_DIR)
+    bundle = os.path.join(model_dir, BUNDLE_FILE)
+    forest = load_forest(bundle)
+    if forest is None:
+        raise SystemExit(f'❌ No model bundle at {bundle}; train a model first.')
+    labels = list(forest.labels)
+    print(f'🧠 Model {version} ({forest.n_estimators} trees), {args.workers} workers, '
+          f'chunks of {args.chunk_size:,}')
+
+    start, total = time.perf_counter(), 0
+    tmp = f'{args.out}.{os.getpid()}.tmp'
+    ctx = multiprocessing.get_context('spawn')
+    try:
+        with app.app_context(), open(tmp, 'w', newline='', encoding='utf-8') as f, \
+                ProcessPoolExecutor(args.workers, mp_context=ctx, initializer=_init_worker,
+                                    initargs=(bundle,)) as pool:
+            writer = csv.writer(f)
+            writer.writerow(['matric_number', 'name', 'department', 'level', 'cgpa', 'prediction',
+                             *(f'p_{cls}' for cls in labels), 'recommendations'])
+            # Keep a couple of chunks per worker in flight; more would only hold
+            # finished chunks in memory until their turn to be written
+            pending = deque()
+            for students, X, cgpa in read_chunks(args.chunk_size, forest.feature_cols):
+                pending.append((students, cgpa, pool.submit(score_chunk, X, cgpa)))
+                if len(pending) >= 2 * args.workers:
+                    students, cgpa, future = pending.popleft()
+                    write_rows(writer, students, cgpa, future.result(), labels)
+                    total += len(students)
+            for students, cgpa, future in pending:
+                write_rows(writer, students, cgpa, future.result(), labels)
+                total += len(students)
+        os.replace(tmp, args.out)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    elapsed = time.perf_counter() - start
+    print(f'✅ Scored {total:,} students → {args.out} '
+          f'({elapsed:.1f}s, {total / max(elapsed, 1e-9):,.0f} rows/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+/**
+ * Typeahead — server-side search for large pick lists
+ * Marks up:  <input data-typeahead="/api/search/students" data-target="student_id">
+ *            <input type="hidden" id="student_id" name="student_id">
+ * The visible input queries the search endpoint as the user types; picking
+ * a match writes its id into the hidden input named by data-target.
+ */
+(function () {
+  'use strict';
+
+  const DEBOUNCE_MS = 200;
+
+  function attach(input) {
+    const hidden = document.getElementById(input.dataset.target);
+    const limit  = input.dataset.limit || 10;
+    const menu   = document.createElement('div');
+    let timer    = null;
+    let seq      = 0;
+    let active   = -1;
+
+    menu.className = 'dropdown-menu typeahead-menu';
+    input.parentNode.classList.add('position-relative');
+    input.insertAdjacentElement('afterend', menu);
+    input.setAttribute('autocomplete', 'off');
+
+    function items() { return menu.querySelectorAll('.dropdown-item'); }
+
+    function close() {
+      menu.classList.remove('show');
+      active = -1;
+    }
+
+    function highlight(index) {
+      const list = items();
+      list.forEach(el => el.classList.remove('active'));
+      if (!list.length) return;
+      active = (index + list.length) % list.length;
+      list[active].classList.add('active');
+    }
+
+    function choose(item) {
+      hidden.value = item.id;
+      input.value  = item.label;
+      input.setCustomValidity('');
+      close();
+    }
+
+    function render(results) {
+      menu.innerHTML = '';
+      if (!results.length) {
+        const empty = document.createElement('span');
+        empty.className   = 'dropdown-item-text text-muted';
+        empty.textContent = 'No matches';
+        menu.appendChild(empty);
+      }
+      results.forEach(item => {
+        const btn = document.createElement('button');
+        btn.type        = 'button';
+        btn.className   = 'dropdown-item';
+        btn.textContent = item.label;
+        // mousedown fires before the input's blur closes the menu
+        btn.addEventListener('mousedown', e => { e.preventDefault(); choose(item); });
+        menu.appendChild(btn);
+      });
+      menu.classList.add('show');
+    }
+
+    function search() {
+      const q    = input.value.trim();
+      const mine = ++seq;
+      if (!q) { close(); return; }
+      fetch(`${input.dataset.typeahead}?q=${encodeURIComponent(q)}&limit=${limit}`)
+        .then(response => response.json())
+        .then(data => { if (mine === seq) render(data.results || []); })
+        .catch(close);
+    }
+
+    input.addEventListener('input', () => {
+      hidden.value = '';
+      input.setCustomValidity(input.required && input.value.trim()
+        ? 'Pick an entry from the list' : '');
+      clearTimeout(timer);
+      timer = setTimeout(search, DEBOUNCE_MS);
+    });
+
+    input.addEventListener('keydown', e => {
+      if (!menu.classList.contains('show')) return;
+      if (e.key === 'ArrowDown')      { e.preventDefault(); highlight(active + 1); }
+      else if (e.key === 'ArrowUp')   { e.preventDefault(); highlight(active - 1); }
+      else if (e.key === 'Escape')    { close(); }
+      else if (e.key === 'Enter' && active >= 0) {
+        e.preventDefault();
+        items()[active].dispatchEvent(new MouseEvent('mousedown'));
+      }
+    });
+
+    input.addEventListener('blur', () => setTimeout(close, 150));
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('[data-typeahead]').forEach(attach);
+  });
+})();
@@ -0,0 +1,104 @@
+"""
+Test fixtures: the app against a throwaway SQLite database.
+
+FLASK_SQLALCHEMY_DATABASE_URI is set before app is imported (the app reads
+its FLASK_* overrides at import), so the tests never touch
+result_management.db. The database is created and seeded once per run.
+"""
+
+import contextlib
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import event
+
+ROOT   = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_DIR = tempfile.mkdtemp(prefix='ars-tests-')
+sys.path.insert(0, ROOT)
+os.environ['FLASK_SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(DB_DIR, 'test.db')
+
+import app as ars   # noqa: E402
+
+_serial = itertools.count(1)
+
+
+@pytest.fixture(scope='session')
+def seeded():
+    ars.init_app_data()
+    yield ars
+    with ars.app.app_context():
+        ars.db.engine.dispose()
+    shutil.rmtree(DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def ctx(seeded):
+    with ars.app.app_context():
+        yield ars
+
+
+@pytest.fixture
+def admin_client(ctx):
+    client = ars.app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    return client
+
+
+@pytest.fixture
+def count_statements(ctx):
+    """Context manager yielding the list of SQL statements run inside it."""
+    @contextlib.contextmanager
+    def _count():
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(ars.db.engine, 'before_cursor_execute', _record)
+        try:
+            yield statements
+        finally:
+            event.remove(ars.db.engine, 'before_cursor_execute', _record)
+    return _count
+
+
+@pytest.fixture
+def add_students(ctx):
+    """add_students(n, score) -> ids: n students, each with score in every
+    first-semester CSC course, summaries and features built. They join CSC,
+    or each a department of their own with new_departments=True (so a lazy
+    per-student department load would show up as extra statements)."""
+    def _add(n, score, new_departments=False):
+        csc     = ars.Department.query.filter_by(code='CSC').one()
+        courses = ars.Course.query.filter_by(department_id=csc.id, semester='First').all()
+        rd_by_course = {c.id: ars.process_result(score, c.credit_unit) for c in courses}
+        students = []
+        for _ in range(n):
+            tag  = f'{next(_serial):05d}'
+            dept = csc
+            if new_departments:
+                dept = ars.Department(name=f'Test Department {tag}', code=f'T{tag}')
+                ars.db.session.add(dept)
+                ars.db.session.flush()
+            students.append(ars.Student(matric_number=f'TST/{tag}', first_name='Test',
+                                        last_name=tag, email=f'{tag}@test.edu',
+                                        department_id=dept.id, level=300))
+        ars.db.session.add_all(students)
+        ars.db.session.flush()
+        for student in students:
+            for course in courses:
+                rd = rd_by_course[course.id]
+                ars.db.session.add(ars.Result(
+                    student_id=student.id, course_id=course.id, session='2023/2024',
+                    score=score, grade=rd['grade'], grade_point=rd['grade_point'],
+                    remarks=rd['remarks']))
+        ids = [s.id for s in students]
+        ars.rebuild_student_summaries(ids, verify=False, commit=False)
+        ars.refresh_student_features(ids)
+        ars.db.session.commit()
+        return ids
+    return _add
@@ -0,0 +1,69 @@
+"""
+The exported model bundle must score exactly like the sklearn model it was
+taken from.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from conftest import ars
+from ml_engine import BUNDLE_FILE, MODEL_FILES, export_bundle, load_forest
+
+LABELS = ['At-Risk', 'Average', 'Excellent', 'Good']
+
+
+@pytest.fixture(scope='module')
+def trained():
+    """(model, scaler, encoder, raw X) for a small forest over FEATURE_COLS."""
+    rng     = np.random.default_rng(7)
+    X       = rng.normal(50, 20, size=(600, len(ars.FEATURE_COLS)))
+    y       = np.array(LABELS)[np.digitize(X[:, 0] + rng.normal(0, 10, len(X)), [35, 50, 65])]
+    scaler  = StandardScaler().fit(X)
+    encoder = LabelEncoder().fit(y)
+    model   = RandomForestClassifier(n_estimators=12, max_depth=8, random_state=0)
+    model.fit(scaler.transform(X), encoder.transform(y))
+    return model, scaler, encoder, X
+
+
+@pytest.fixture
+def model_dir(tmp_path, trained):
+    """A model directory holding the bundle and the sklearn pickles."""
+    model, scaler, encoder, _ = trained
+    export_bundle(model, scaler, encoder, ars.FEATURE_COLS, str(tmp_path / BUNDLE_FILE))
+    for name, obj in zip(MODEL_FILES, (model, scaler, encoder, list(ars.FEATURE_COLS))):
+        with open(tmp_path / name, 'wb') as f:
+            pickle.dump(obj, f)
+    return str(tmp_path)
+
+
+def test_flat_forest_matches_sklearn(trained, model_dir):
+    model, scaler, encoder, _ = trained
+    forest = load_forest(os.path.join(model_dir, BUNDLE_FILE))
+    assert forest is not None and forest.matches(model)
+
+    rows = np.random.default_rng(11).normal(50, 25, size=(300, len(ars.FEATURE_COLS)))
+    Xs   = scaler.transform(rows)
+    assert np.allclose(forest.transform(rows), Xs)
+    assert np.allclose(forest.predict_proba(Xs), model.predict_proba(Xs))
+    assert np.array_equal(forest.predict(Xs), model.predict(Xs))
+    assert list(forest.labels) == list(encoder.classes_)
+
+
+def test_analyzer_switches_to_sklearn_above_flat_forest_max_rows(trained, model_dir):
+    model, scaler, _, _ = trained
+    analyzer = ars.PerformanceAnalyzer(model_dir, version='test')
+    rng      = np.random.default_rng(3)
+    n_cols   = len(ars.FEATURE_COLS)
+
+    small = scaler.transform(rng.normal(50, 25, size=(ars.FLAT_FOREST_MAX_ROWS, n_cols)))
+    assert np.allclose(analyzer._predict_proba(small), model.predict_proba(small))
+    assert analyzer.model is None   # the flat forest answered; no pickle loaded
+
+    large = scaler.transform(rng.normal(50, 25, size=(ars.FLAT_FOREST_MAX_ROWS + 1, n_cols)))
+    assert np.allclose(analyzer._predict_proba(large), model.predict_proba(large))
+    assert analyzer.model is not None   # sklearn answered
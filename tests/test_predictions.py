@@ -0,0 +1,75 @@
+"""
+The batch and vectorised scoring paths must give what the original
+per-student ones did.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import ars
+
+
+def baseline_feature_row(student_results, attendance_rate=75.0, study_hours=5.0):
+    """The dict-per-student feature builder that fed the original pd.DataFrame."""
+    scores = [float(r['score']) for r in student_results]
+    gpas   = [float(r.get('gpa', 0)) for r in student_results]
+    grades = [r.get('grade', 'F') for r in student_results]
+
+    failed = grades.count('F')
+    half   = max(len(scores) // 2, 1)
+    prev   = float(np.mean(scores[:half]))
+    row = {
+        'avg_score':            round(np.mean(scores), 4),
+        'prev_avg_score':       round(prev, 4),
+        'score_trend':          round(float(np.mean(scores[-half:])) - prev, 4),
+        'score_std':            round(np.std(scores) if len(scores) > 1 else 0.0, 4),
+        'failed_courses':       failed,
+        'gpa':                  round(gpas[-1] if gpas else 0.0, 4),
+        'pass_rate':            round((len(grades) - failed) / len(grades) * 100, 4),
+        'attendance_rate':      round(attendance_rate, 4),
+        'study_hours_per_week': round(study_hours, 4),
+        'num_courses':          len(scores),
+    }
+    return np.array([row[col] for col in ars.FEATURE_COLS], dtype=np.float64)
+
+
+FEATURE_CASES = {
+    'one result':   [{'score': 72, 'grade': 'A', 'gpa': 4.5}],
+    'odd count':    [{'score': s, 'grade': g, 'gpa': 3.1}
+                     for s, g in ((55, 'C'), (61.5, 'B'), (38, 'F'), (80, 'A'), (47, 'D'))],
+    'all failing':  [{'score': s, 'grade': 'F', 'gpa': 0.0} for s in (12, 30, 39.99, 0)],
+    'missing gpa':  [{'score': 66, 'grade': 'B'}, {'score': 44.25, 'grade': 'D'}],
+    'missing grade': [{'score': 50, 'gpa': 2.0}, {'score': 70, 'grade': 'A', 'gpa': 2.5}],
+}
+
+
+@pytest.mark.parametrize('results', FEATURE_CASES.values(), ids=FEATURE_CASES.keys())
+def test_feature_row_matches_baseline(ctx, results):
+    expected = baseline_feature_row(results, 82.5, 7.25)
+    row      = ctx.PerformanceAnalyzer._feature_row(results, 82.5, 7.25)
+    assert np.allclose(row, expected, rtol=0, atol=1e-9)
+    matrix   = ctx.get_analyzer()._build_feature_matrix([results, results[:1]], 82.5, 7.25)
+    assert np.allclose(matrix, [expected, baseline_feature_row(results[:1], 82.5, 7.25)],
+                       rtol=0, atol=1e-9)
+
+
+def test_batch_predictions_match_per_student(ctx, add_students):
+    ids = []
+    for score in (20, 35, 48, 62, 90):
+        ids += add_students(2, score=score)
+    results = ctx.load_results_by_student(ids)
+    # Mixed scores within a student, and students with too few results
+    results[ids[0]] = [dict(r, score=s) for r, s in zip(results[ids[0]], (15, 80, 40, 95, 5))]
+    results[-1] = results[ids[1]][:1]
+    results[-2] = []
+
+    analyzer = ctx.get_analyzer()
+    assert analyzer._ml_ready
+    single   = {sid: analyzer.predict_performance(res) for sid, res in results.items()}
+    batch    = analyzer.predict_performance_batch(results)
+    assert {sid: scored['prediction'] for sid, scored in batch.items()} == single
+    assert single[-1] == single[-2] == 'Insufficient Data'
+
+    at_risk = [sid for sid, label in single.items() if label == 'At-Risk']
+    assert at_risk
+    assert analyzer.identify_at_risk_students(results) == at_risk
@@ -0,0 +1,53 @@
+"""
+Statement-count regressions: the cohort-wide pages and loaders must run the
+same number of SQL statements however many rows they cover.
+"""
+
+
+def test_load_results_by_student_is_one_statement(ctx, add_students, count_statements):
+    counts = []
+    for n in (3, 30):
+        add_students(n, score=55)
+        with count_statements() as statements:
+            grouped = ctx.load_results_by_student()
+        assert len(grouped) >= n
+        counts.append(len(statements))
+    assert counts[0] == counts[1] == 1
+
+
+def test_analytics_statements_do_not_grow_with_cohort(ctx, admin_client, add_students,
+                                                      count_statements):
+    ctx.get_analyzer()
+    counts, at_risk = [], []
+    for n in (2, 20):
+        add_students(n, score=25, new_departments=True)   # failing everything: At-Risk
+        ctx.refresh_risk_snapshot()
+        with count_statements() as statements:
+            response = admin_client.get('/admin/analytics')
+        assert response.status_code == 200
+        counts.append(len(statements))
+        at_risk.append(ctx.RiskSnapshot.query.filter_by(label='At-Risk').count())
+    assert at_risk[1] > at_risk[0]
+    assert counts[0] == counts[1]
+
+
+def test_department_counts_do_not_grow_with_departments(ctx, admin_client, add_students,
+                                                        count_statements):
+    counts, listed = [], []
+    for n in (1, 10):
+        for student_id in add_students(n, score=60, new_departments=True):
+            dept_id = ctx.db.session.get(ctx.Student, student_id).department_id
+            ctx.db.session.add(ctx.Course(course_code=f'D{dept_id}01', course_title='Test Course',
+                                          credit_unit=3, semester='First', level=300,
+                                          department_id=dept_id))
+            ctx.db.session.add(ctx.User(username=f'lecturer-d{dept_id}', role='lecturer',
+                                        email=f'lecturer-d{dept_id}@test.edu',
+                                        password_hash='-', department_id=dept_id))
+        ctx.db.session.commit()
+        with count_statements() as statements:
+            response = admin_client.get('/admin/departments')
+        assert response.status_code == 200
+        counts.append(len(statements))
+        listed.append(ctx.Department.query.count())
+    assert listed[1] == listed[0] + 10
+    assert counts[0] == counts[1]
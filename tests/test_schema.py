@@ -0,0 +1,36 @@
+"""
+database/schema.sql must load and stay in step with the SQLAlchemy models.
+"""
+
+import os
+import sqlite3
+
+from conftest import ROOT, ars
+
+SCHEMA_PATH = os.path.join(ROOT, 'database', 'schema.sql')
+
+
+def _load_schema():
+    conn = sqlite3.connect(':memory:')
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+    return conn
+
+
+def test_schema_tables_have_the_model_columns():
+    conn   = _load_schema()
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table in ars.db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table.name})')}
+        assert {c.name for c in table.columns} <= columns, table.name
+
+
+def test_schema_has_every_model_table_and_index():
+    conn    = _load_schema()
+    objects = {name for (name,) in conn.execute("SELECT name FROM sqlite_master")}
+    for table in ars.db.metadata.sorted_tables:
+        assert table.name in objects
+        for index in table.indexes:
+            assert index.name in objects, index.name
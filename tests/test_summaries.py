@@ -0,0 +1,52 @@
+"""
+Incrementally maintained GPA/CGPA must equal a full rescan of the results.
+"""
+
+SESSION = '2023/2024'
+
+
+def _summary(ctx, student_id, semester):
+    row = ctx.SessionSummary.query.filter_by(
+        student_id=student_id, session=SESSION, semester=semester).first()
+    return row.total_units, row.total_points, row.gpa, row.cgpa
+
+
+def _assert_matches_full_scan(ctx, student_id, semester):
+    assert _summary(ctx, student_id, semester) == \
+        ctx._full_scan_summary(student_id, SESSION, semester)
+    totals = ctx.db.session.get(ctx.StudentTotal, student_id)
+    assert (totals.total_units, totals.total_points) == ctx._scan_totals(student_id)
+
+
+def test_apply_result_change_matches_full_scan(ctx, add_students):
+    (sid,) = add_students(1, score=58)
+    first  = ctx.Result.query.filter_by(student_id=sid).order_by(ctx.Result.id).all()
+    second = ctx.Course.query.filter_by(course_code='CSC306').one()
+
+    # Insert: a first result in a new semester
+    rd = ctx.process_result(71, second.credit_unit)
+    ctx.db.session.add(ctx.Result(student_id=sid, course_id=second.id, session=SESSION,
+                                  score=71, grade=rd['grade'], grade_point=rd['grade_point'],
+                                  remarks=rd['remarks']))
+    ctx.apply_result_change(sid, SESSION, 'Second', second.credit_unit,
+                            new_point=rd['grade_point'])
+    _assert_matches_full_scan(ctx, sid, 'Second')
+
+    # Update: regrade an existing result
+    result    = first[0]
+    old_point = result.grade_point
+    rd = ctx.process_result(32, result.course.credit_unit)
+    result.score, result.grade, result.grade_point = 32, rd['grade'], rd['grade_point']
+    ctx.apply_result_change(sid, SESSION, 'First', result.course.credit_unit,
+                            old_point=old_point, new_point=rd['grade_point'])
+    _assert_matches_full_scan(ctx, sid, 'First')
+
+    # Delete
+    result = first[1]
+    credit_unit, old_point = result.course.credit_unit, result.grade_point
+    ctx.db.session.delete(result)
+    ctx.apply_result_change(sid, SESSION, 'First', credit_unit, old_point=old_point)
+    _assert_matches_full_scan(ctx, sid, 'First')
+
+    report = ctx.rebuild_student_summaries([sid])
+    assert (report['drifted'], report['created'], report['mismatches']) == (0, 0, [])
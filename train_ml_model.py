@@ -1,25 +1,22 @@
 """
 ML Model Trainer for Student Performance Prediction
 Run this AFTER generate_training_data.py:  python train_ml_model.py
+
+Training data is read in chunks, so files larger than memory are fine:
+  --data PATH         training CSV or npy directory (default ml_data/student_training_data.csv)
+  --chunk-rows N      rows read at a time (default 200000)
+  --max-rows N        stratified sample size the forest is fitted on (default 500000)
+  --trees N           number of trees (default 200)
 """
 
-import pandas as pd
-import numpy as np
-import pickle
+import argparse
 import os
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import (classification_report, accuracy_score,
-                             confusion_matrix, roc_auc_score)
-from sklearn.pipeline import Pipeline
+
+from ml_engine import (BUNDLE_FILE, MODEL_FILES, TRAINING_CHUNK_ROWS, TRAINING_MAX_ROWS,
+                       train_model)
 
 TRAINING_CSV   = 'ml_data/student_training_data.csv'
 MODEL_DIR      = 'ml_data'
-MODEL_PATH     = os.path.join(MODEL_DIR, 'performance_model.pkl')
-SCALER_PATH    = os.path.join(MODEL_DIR, 'scaler.pkl')
-ENCODER_PATH   = os.path.join(MODEL_DIR, 'label_encoder.pkl')
-FEATURE_PATH   = os.path.join(MODEL_DIR, 'feature_names.pkl')
 
 FEATURE_COLS = [
     'avg_score', 'prev_avg_score', 'score_trend', 'score_std',
@@ -27,73 +24,52 @@ FEATURE_COLS = [
     'attendance_rate', 'study_hours_per_week', 'num_courses'
 ]
 
-TARGET_COL = 'performance_label'
 
-
-def train():
+def train(data=TRAINING_CSV, n_estimators=200, chunk_rows=TRAINING_CHUNK_ROWS,
+          max_rows=TRAINING_MAX_ROWS):
     print("📂 Loading training data...")
-    df = pd.read_csv(TRAINING_CSV)
-    print(f"   Records: {len(df)}")
-
-    X = df[FEATURE_COLS]
-    y = df[TARGET_COL]
-
-    # Encode labels
-    le = LabelEncoder()
-    y_enc = le.fit_transform(y)
-    print(f"   Classes: {list(le.classes_)}")
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y_enc, test_size=0.2, random_state=42, stratify=y_enc)
-
-    # Scale features
-    scaler = StandardScaler()
-    X_train_s = scaler.fit_transform(X_train)
-    X_test_s  = scaler.transform(X_test)
-
-    # --- Train Random Forest (primary model) ---
-    print("\n🌲 Training Random Forest Classifier...")
-    rf = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=12,
-        min_samples_split=4,
-        min_samples_leaf=2,
-        class_weight='balanced',
-        random_state=42,
-        n_jobs=-1
-    )
-    rf.fit(X_train_s, y_train)
-
-    # Cross-validation
-    cv_scores = cross_val_score(rf, X_train_s, y_train, cv=5, scoring='accuracy')
-    print(f"   CV Accuracy: {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
-
-    # Test evaluation
-    y_pred = rf.predict(X_test_s)
-    acc = accuracy_score(y_test, y_pred)
-    print(f"   Test Accuracy: {acc:.4f}")
+    phases = set()
+
+    def progress(phase, pct):
+        # Row counts update once per chunk; print each phase only once
+        name = phase.split(':')[0]
+        if name not in phases:
+            phases.add(name)
+            print(f"   {phase}")
+
+    summary = train_model(data, MODEL_DIR, n_estimators, FEATURE_COLS, progress,
+                          max_rows=max_rows, chunk_rows=chunk_rows)
+
+    print(f"\n🌲 Random Forest ({summary['n_estimators']} trees)")
+    print(f"   Records: {summary['training_rows']:,} "
+          f"(fitted on {summary['sampled_rows']:,})")
+    print(f"   CV Accuracy: {summary['cv_accuracy']:.2f}% ± {summary['cv_std']:.2f}%")
+    print(f"   Test Accuracy: {summary['test_accuracy']:.2f}%")
+    print(f"   Peak memory (traced): {summary['peak_memory_mb']:,.1f} MB")
+
     print("\n   Classification Report:")
-    print(classification_report(y_test, y_pred, target_names=le.classes_))
+    print(f"     {'':12}{'precision':>10}{'recall':>10}{'f1':>10}{'support':>10}")
+    for cls, m in summary['per_class'].items():
+        print(f"     {cls:12}{m['precision']:10.3f}{m['recall']:10.3f}{m['f1']:10.3f}{m['support']:10,}")
 
-    # Feature importance
-    importances = pd.Series(rf.feature_importances_, index=FEATURE_COLS)
     print("\n   Feature Importances:")
-    for feat, imp in importances.sort_values(ascending=False).items():
+    for feat, imp in summary['feature_importance'].items():
         print(f"     {feat:30s}: {imp:.4f}")
 
-    # --- Save artefacts ---
-    os.makedirs(MODEL_DIR, exist_ok=True)
-    with open(MODEL_PATH,   'wb') as f: pickle.dump(rf, f)
-    with open(SCALER_PATH,  'wb') as f: pickle.dump(scaler, f)
-    with open(ENCODER_PATH, 'wb') as f: pickle.dump(le, f)
-    with open(FEATURE_PATH, 'wb') as f: pickle.dump(FEATURE_COLS, f)
-
-    print(f"\n✅ Model saved → {MODEL_PATH}")
-    print(f"✅ Scaler saved → {SCALER_PATH}")
-    print(f"✅ Encoder saved → {ENCODER_PATH}")
+    print()
+    for name in (*MODEL_FILES[:3], BUNDLE_FILE):
+        print(f"✅ Saved → {os.path.join(MODEL_DIR, name)}")
 
-    return acc
+    return summary['test_accuracy'] / 100
 
 
 if __name__ == '__main__':
-    train()
+    parser = argparse.ArgumentParser(description='Train the student performance model.')
+    parser.add_argument('--data', default=TRAINING_CSV, help='training CSV or npy directory')
+    parser.add_argument('--trees', type=int, default=200, help='number of trees')
+    parser.add_argument('--chunk-rows', type=int, default=TRAINING_CHUNK_ROWS,
+                        help='rows read at a time')
+    parser.add_argument('--max-rows', type=int, default=TRAINING_MAX_ROWS,
+                        help='stratified sample size the forest is fitted on')
+    args = parser.parse_args()
+    train(args.data, args.trees, args.chunk_rows, args.max_rows)
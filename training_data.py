@@ -0,0 +1,336 @@
+"""
+Synthetic Training Data
+Generates student records for ML model training with whole-array numpy
+operations: every course of every student in a chunk is drawn at once,
+into a (students x MAX_COURSES) block where a mask marks the courses each
+student actually took. Rows are produced chunk by chunk and written as
+they come, so memory stays bounded by the chunk size however many rows
+are asked for.
+
+Output formats:
+  csv   one CSV file, the format app.py and train_ml_model.py train from
+  npy   a directory with one .npy file per column (columnar, memory-mappable;
+        text columns are ASCII bytes, values float32, counts int16)
+
+Next to every data file sits a small JSON sidecar (<path>.meta.json) with
+its row count, class balance and schema, so nothing has to read a large
+file just to describe it.
+
+Used by generate_training_data.py and the /admin/ml/generate route;
+app.py's database export writes through write_chunks as well.
+"""
+
+import os
+import csv
+import json
+import shutil
+import hashlib
+import datetime
+
+import numpy as np
+
+COLUMNS = [
+    'student_id', 'department', 'level', 'semester', 'num_courses',
+    'avg_score', 'prev_avg_score', 'score_trend', 'score_std', 'failed_courses',
+    'gpa', 'pass_rate', 'attendance_rate', 'study_hours_per_week', 'performance_label',
+]
+LABEL_COLUMN = 'performance_label'
+
+# Student archetypes for a realistic distribution: (mean_score, std, weight)
+ARCHETYPES = np.array([
+    (78, 6,  0.15),   # High achievers
+    (68, 7,  0.25),   # Good students
+    (57, 8,  0.30),   # Average students
+    (47, 9,  0.20),   # Struggling students
+    (35, 10, 0.10),   # At-risk students
+])
+DEPARTMENTS  = np.array(['Computer Science', 'Engineering', 'Business', 'Medicine', 'Law', 'Arts'])
+LEVELS       = np.array([100, 200, 300, 400])
+SEMESTERS    = np.array(['First', 'Second'])
+CREDIT_UNITS = np.array([2, 3, 4])
+MIN_COURSES, MAX_COURSES = 4, 7
+
+# Grade boundaries (F < 40 <= E < 45 <= D < 50 <= C < 60 <= B < 70 <= A) and
+# the grade point of each band, lowest first
+GRADE_BOUNDS = np.array([40, 45, 50, 60, 70])
+GRADE_POINTS = np.array([0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+
+LABELS = np.array(['Excellent', 'Good', 'Average', 'At-Risk'])
+
+_TEXT_VALUES = {'department': DEPARTMENTS, 'semester': SEMESTERS, LABEL_COLUMN: LABELS}
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+
+def grade_points(scores):
+    """Grade point of every score, elementwise."""
+    return GRADE_POINTS[np.searchsorted(GRADE_BOUNDS, scores, side='right')]
+
+
+def performance_labels(avg_score, failed_courses, gpa, trend):
+    """Ground truth labels from realistic academic criteria, elementwise."""
+    return np.select([
+        (avg_score >= 68) & (failed_courses == 0) & (gpa >= 3.5),
+        (avg_score >= 55) & (failed_courses <= 1) & (gpa >= 2.5) & (trend >= -3),
+        (avg_score >= 45) & (failed_courses <= 2) & (gpa >= 1.5),
+    ], LABELS[:3], default=LABELS[3])
+
+
+def generate_chunk(rng, n_rows, first_id=1001):
+    """n_rows students as a dict of column arrays, in COLUMNS order."""
+    archetype = rng.choice(len(ARCHETYPES), size=n_rows, p=ARCHETYPES[:, 2])
+    mean_s    = ARCHETYPES[archetype, 0]
+    std_s     = ARCHETYPES[archetype, 1]
+
+    num_courses = rng.integers(MIN_COURSES, MAX_COURSES + 1, size=n_rows)
+    taken       = np.arange(MAX_COURSES) < num_courses[:, np.newaxis]
+    credits     = np.where(taken, rng.choice(CREDIT_UNITS, size=(n_rows, MAX_COURSES)), 0)
+    scores      = np.clip(rng.normal(mean_s[:, np.newaxis], std_s[:, np.newaxis],
+                                     (n_rows, MAX_COURSES)), 0, 100).astype(int)
+    scores      = np.where(taken, scores, 0)
+
+    # Attendance and weekly study hours rise slightly with the archetype
+    attendance  = np.clip(rng.normal(75 + (mean_s - 55) * 0.3, 10), 20, 100)
+    study_hours = np.clip(rng.normal(2 + (mean_s - 40) * 0.08, 1.5), 0, 12)
+
+    mean      = scores.sum(axis=1) / num_courses
+    avg_score = np.round(mean, 2)
+    score_std = np.round(np.sqrt(np.where(taken, (scores - mean[:, np.newaxis]) ** 2, 0.0)
+                                 .sum(axis=1) / num_courses), 2)
+    failed    = (taken & (scores < 40)).sum(axis=1)
+    gpa       = np.round((grade_points(scores) * credits).sum(axis=1) / credits.sum(axis=1), 2)
+
+    # A previous semester average with some noise
+    prev_avg = np.round(np.clip(avg_score + rng.normal(0, 5, n_rows), 0, 100), 2)
+    trend    = avg_score - prev_avg
+
+    ids = np.arange(first_id, first_id + n_rows)
+    return {
+        'student_id':           np.char.add('STU', ids.astype(str)),
+        'department':           rng.choice(DEPARTMENTS, size=n_rows),
+        'level':                rng.choice(LEVELS, size=n_rows),
+        'semester':             rng.choice(SEMESTERS, size=n_rows),
+        'num_courses':          num_courses,
+        'avg_score':            avg_score,
+        'prev_avg_score':       prev_avg,
+        'score_trend':          np.round(trend, 2),
+        'score_std':            score_std,
+        'failed_courses':       failed,
+        'gpa':                  gpa,
+        'pass_rate':            np.round((num_courses - failed) / num_courses * 100, 2),
+        'attendance_rate':      np.round(attendance, 2),
+        'study_hours_per_week': np.round(study_hours, 2),
+        'performance_label':    performance_labels(avg_score, failed, gpa, trend),
+    }
+
+
+def generate(n_rows, chunk_rows=DEFAULT_CHUNK_ROWS, seed=42, first_id=1001):
+    """Yield n_rows students in chunks of at most chunk_rows (see generate_chunk)."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_rows, chunk_rows):
+        yield generate_chunk(rng, min(chunk_rows, n_rows - start), first_id + start)
+
+
+def _npy_dtype(column, n_rows, first_id):
+    """Column dtypes for the npy format: ASCII bytes, int16 counts, float32 values."""
+    if column == 'student_id':
+        return f'S{len("STU") + len(str(first_id + max(n_rows - 1, 0)))}'
+    if column in _TEXT_VALUES:
+        return f'S{max(len(v) for v in _TEXT_VALUES[column])}'
+    if column in ('level', 'num_courses', 'failed_courses'):
+        return np.int16
+    return np.float32
+
+
+def _count_labels(distribution, chunk):
+    labels, counts = np.unique(chunk[LABEL_COLUMN], return_counts=True)
+    for label, count in zip(labels.tolist(), counts.tolist()):
+        distribution[label] += count
+
+
+def write_training_data(path, n_rows, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS, seed=42,
+                        first_id=1001):
+    """Generate n_rows students into path and return {'rows', 'distribution'}."""
+    dtypes = {c: _npy_dtype(c, n_rows, first_id) for c in COLUMNS}
+    return write_chunks(path, generate(n_rows, chunk_rows, seed, first_id), fmt, dtypes, n_rows)
+
+
+def write_chunks(path, chunks, fmt='csv', dtypes=None, n_rows=None):
+    """Write chunks (dicts of COLUMNS arrays) to path; return {'rows', 'distribution'}.
+
+    The output is written under a temporary name, which is removed again if
+    writing fails. A csv file then atomically replaces path. An npy
+    directory cannot be swapped atomically, so the old directory is renamed
+    aside, the new one renamed in and only then the old one deleted: path
+    is missing just between the two renames, and a reader never sees a
+    half-written directory. For npy, dtypes gives each column's dtype; when
+    n_rows is not known up front, each column is streamed to a headerless
+    file first and copied behind its header at the end.
+    """
+    if fmt not in ('csv', 'npy'):
+        raise ValueError(f'Unknown training data format {fmt!r}.')
+    tmp = f'{path}.{os.getpid()}.tmp'
+    distribution = dict.fromkeys(LABELS.tolist(), 0)
+    rows = 0
+
+    try:
+        if fmt == 'csv':
+            import pandas as pd
+            with open(tmp, 'w', newline='', encoding='utf-8') as f:
+                for chunk in chunks:
+                    pd.DataFrame(chunk, columns=COLUMNS).to_csv(f, header=(rows == 0), index=False)
+                    rows += len(chunk[LABEL_COLUMN])
+                    _count_labels(distribution, chunk)
+                if rows == 0:
+                    f.write(','.join(COLUMNS) + '\n')
+        else:
+            # With the row count known each column file gets its header up front;
+            # either way each chunk is appended as it comes, so nothing but the
+            # current chunk is ever held in memory
+            dtypes = {c: np.dtype(dtypes[c]) for c in COLUMNS}
+            suffix = '.npy' if n_rows is not None else '.bin'
+            os.makedirs(tmp, exist_ok=True)
+            files  = {c: open(os.path.join(tmp, c + suffix), 'wb') for c in COLUMNS}
+            try:
+                if n_rows is not None:
+                    for c, f in files.items():
+                        _write_npy_header(f, dtypes[c], n_rows)
+                for chunk in chunks:
+                    for c, f in files.items():
+                        f.write(np.ascontiguousarray(chunk[c], dtype=dtypes[c]).tobytes())
+                    rows += len(chunk[LABEL_COLUMN])
+                    _count_labels(distribution, chunk)
+            finally:
+                for f in files.values():
+                    f.close()
+            if n_rows is None:
+                for c in COLUMNS:
+                    raw = os.path.join(tmp, c + suffix)
+                    with open(raw, 'rb') as src, open(os.path.join(tmp, f'{c}.npy'), 'wb') as dst:
+                        _write_npy_header(dst, dtypes[c], rows)
+                        shutil.copyfileobj(src, dst, 1 << 20)
+                    os.remove(raw)
+            elif rows != n_rows:
+                raise ValueError(f'Expected {n_rows} rows, got {rows}.')
+        _replace_output(tmp, path)
+    finally:
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp, ignore_errors=True)
+        elif os.path.exists(tmp):
+            os.remove(tmp)
+
+    distribution = {k: v for k, v in distribution.items() if v}
+    write_sidecar(path, rows, distribution, COLUMNS)
+    return {'rows': rows, 'distribution': distribution}
+
+
+def _replace_output(tmp, path):
+    """Move tmp to path; an existing directory at path is renamed aside
+    first, put back if the move fails, and deleted once it succeeds."""
+    if not os.path.isdir(path):
+        os.replace(tmp, path)
+        return
+    old = f'{path}.{os.getpid()}.old'
+    os.replace(path, old)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        os.replace(old, path)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def _write_npy_header(f, dtype, n_rows):
+    np.lib.format.write_array_header_1_0(f, {
+        'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (n_rows,)})
+
+
+def read_npy(path, mmap_mode='r'):
+    """The columns of an npy training directory, memory-mapped by default.
+
+    Text columns come back as bytes; decode them with .astype(str) if needed.
+    """
+    return {c: np.load(os.path.join(path, f'{c}.npy'), mmap_mode=mmap_mode) for c in COLUMNS}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# METADATA SIDECAR
+# <path>.meta.json records the data file's size and mtime when it was
+# written; a sidecar whose data file has changed since is ignored.
+# ══════════════════════════════════════════════════════════════════════════════
+SIDECAR_SUFFIX = '.meta.json'
+
+
+def _data_file(path):
+    """The file whose size and mtime stand for path (an npy directory's label column)."""
+    return os.path.join(path, f'{LABEL_COLUMN}.npy') if os.path.isdir(path) else path
+
+
+def schema_hash(columns):
+    return hashlib.sha256(json.dumps(list(columns)).encode('utf-8')).hexdigest()[:16]
+
+
+def data_columns(path):
+    """Column names of a training CSV (its header) or npy directory."""
+    if os.path.isdir(path):
+        return list(COLUMNS)
+    with open(path, encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def write_sidecar(path, rows, distribution, columns):
+    """Describe the data file at path in its sidecar; False if it cannot be written."""
+    st   = os.stat(_data_file(path))
+    meta = {
+        'rows':          int(rows),
+        'class_balance': {str(k): int(v) for k, v in distribution.items()},
+        'columns':       list(columns),
+        'schema_hash':   schema_hash(columns),
+        'size':          st.st_size,
+        'mtime_ns':      st.st_mtime_ns,
+        'written_at':    datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    tmp = f'{path}{SIDECAR_SUFFIX}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, path + SIDECAR_SUFFIX)
+        return True
+    except OSError:
+        return False
+
+
+def read_sidecar(path):
+    """The sidecar of path, or None when it is missing, unreadable or stale."""
+    try:
+        with open(path + SIDECAR_SUFFIX, encoding='utf-8') as f:
+            meta = json.load(f)
+        st = os.stat(_data_file(path))
+    except (OSError, ValueError):
+        return None
+    if meta.get('size') != st.st_size or meta.get('mtime_ns') != st.st_mtime_ns:
+        return None
+    return meta
+
+
+def count_rows(path, block_size=1 << 20):
+    """Data rows in path without parsing it: newlines in a CSV (less the
+    header), or the length in an npy directory's label column header."""
+    if os.path.isdir(path):
+        with open(_data_file(path), 'rb') as f:
+            np.lib.format.read_magic(f)
+            return np.lib.format.read_array_header_1_0(f)[0][0]
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        while block := f.read(block_size):
+            lines += block.count(b'\n')
+            last   = block[-1:]
+    if last != b'\n':
+        lines += 1   # final line without a newline
+    return max(lines - 1, 0)
+
+
+def training_data_rows(path):
+    """Row count of path: from a current sidecar, else by streaming it."""
+    meta = read_sidecar(path)
+    return meta['rows'] if meta else count_rows(path)
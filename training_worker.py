@@ -0,0 +1,44 @@
+"""
+Training Job Process
+The child process app.py starts for a background training job. It imports
+only ml_engine (never app.py), so starting it neither re-runs the app's
+start-up nor touches the database.
+
+Run by app.py:  python training_worker.py '<json job arguments>'
+(the frozen EXE runs itself with --training-worker instead)
+
+Progress and the outcome are written to stdout as one JSON list per line,
+in the messages ml_engine.run_training_job sends: ["progress", phase,
+percent], then ["done", summary] or ["error", message]. Anything else the
+training prints goes to stderr.
+"""
+
+import json
+import sys
+
+from ml_engine import run_training_job
+
+
+class _LineChannel:
+    """The queue run_training_job reports to, as JSON lines on a stream."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def put(self, message):
+        self.stream.write(json.dumps(message) + '\n')
+        self.stream.flush()
+
+
+def main(argv=None):
+    argv    = sys.argv[1:] if argv is None else argv
+    job     = json.loads(argv[-1])
+    channel = _LineChannel(sys.stdout)
+    sys.stdout = sys.stderr   # keep stray prints off the message channel
+    run_training_job(channel, job['csv_path'], job['out_dir'], job['n_estimators'],
+                     job['feature_cols'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
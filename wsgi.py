@@ -0,0 +1,16 @@
+"""
+WSGI Entry Point
+For serving the app with a WSGI server instead of python app.py:
+
+    gunicorn --workers 1 --threads 8 wsgi:app
+    flask --app wsgi run
+
+Importing app.py only defines the application; this module also prepares
+the database (schema, seed data, derived tables) and starts the background
+workers, as python app.py does. Run a single server process: the database
+is SQLite and the background workers belong to the process that serves.
+"""
+
+from app import app, init_server
+
+init_server()